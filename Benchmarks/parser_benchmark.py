@@ -0,0 +1,51 @@
+from CiscoAutomationFramework.Parsers import parse_mac_address_table, parse_arp_table, mac_pattern
+from CiscoAutomationFramework.util import column_print
+from time import perf_counter
+import os
+import re
+
+recorded_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recorded')
+mac_regex = re.compile(mac_pattern)
+
+
+def load_recorded(name):
+    with open(os.path.join(recorded_dir, name)) as file:
+        return file.read().splitlines()
+
+
+def scale_output(lines, entries):
+    # Repeat the recorded data rows with unique MAC addresses until the table holds the requested entry count
+    data_rows = [index for index, line in enumerate(lines) if mac_regex.search(line)]
+    first, last = data_rows[0], data_rows[-1]
+    scaled = lines[:first]
+    for n in range(entries):
+        row = lines[data_rows[n % len(data_rows)]]
+        mac = f'{n:012x}'
+        scaled.append(mac_regex.sub(f'{mac[:4]}.{mac[4:8]}.{mac[8:]}', row))
+    return scaled + lines[last + 1:]
+
+
+def benchmark(parser, lines, firmware, rounds=5):
+    best = None
+    for _ in range(rounds):
+        start = perf_counter()
+        parsed = parser(lines, firmware)
+        elapsed = perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(parsed), best
+
+
+if __name__ == '__main__':
+    cases = [
+        ('IOS mac address-table', parse_mac_address_table, 'ios_mac_address_table.txt', 'IOS'),
+        ('NXOS mac address-table', parse_mac_address_table, 'nxos_mac_address_table.txt', 'NXOS'),
+        ('IOS ip arp', parse_arp_table, 'ios_arp_table.txt', 'IOS'),
+        ('NXOS ip arp', parse_arp_table, 'nxos_arp_table.txt', 'NXOS'),
+    ]
+
+    data = [['Output', 'Lines', 'Entries', 'Best (ms)', 'Entries/sec']]
+    for name, parser, recorded, firmware in cases:
+        lines = scale_output(load_recorded(recorded), 100000)
+        entries, best = benchmark(parser, lines, firmware)
+        data.append([name, len(lines), entries, f'{best * 1000:.1f}', f'{entries / best:,.0f}'])
+    column_print(data, separator_char='_')
@@ -0,0 +1,67 @@
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.util import column_print
+from CiscoAutomationFramework import connect_ssh, connect_replay
+from time import perf_counter
+import argparse
+import os
+
+username = 'admin'
+password = 'admin'
+steps = ('uptime', 'interfaces', 'mac_address_entries', 'arp_entries', 'running_config')
+
+
+def record(path, firmware, config_lines):
+    with MockCiscoServer(firmware=firmware, username=username, password=password,
+                         running_config_lines=config_lines) as server:
+        with connect_ssh('127.0.0.1', username, password, port=server.port, deterministic_completion=True,
+                         record_to=path) as ssh:
+            for step in steps:
+                getattr(ssh, step)
+
+
+def replay(path, speed, rounds):
+    best = {}
+    firmware = ''
+    for _ in range(rounds):
+        # The steps are replayed in the order they were recorded, the replay refuses anything else
+        start = perf_counter()
+        ssh = connect_replay(path, speed)
+        timings = [('detect_firmware', perf_counter() - start)]
+        for step in steps:
+            start = perf_counter()
+            getattr(ssh, step)
+            timings.append((step, perf_counter() - start))
+        ssh.close_connection()
+        firmware = type(ssh).__name__
+        for step, elapsed in timings:
+            best[step] = min(best.get(step, elapsed), elapsed)
+    return firmware, best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Profile firmware detection, properties and parsers against '
+                                                 'recorded sessions, without a network')
+    parser.add_argument('recordings', nargs='*', help='session recordings made with connect_ssh(record_to=...)')
+    parser.add_argument('--record', nargs='+', choices=('IOS', 'IOSXE', 'NXOS'), default=[],
+                        help='record a session against the mock device first, for each firmware given')
+    parser.add_argument('--directory', default='.', help='where --record writes its recordings')
+    parser.add_argument('--config-lines', type=int, default=5000, help='lines in the mock running config')
+    parser.add_argument('--speed', type=float, help='replay at this multiple of the recorded speed, default is as '
+                                                    'fast as possible')
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args()
+
+    recordings = list(args.recordings)
+    for firmware in args.record:
+        path = os.path.join(args.directory, f'{firmware.lower()}_session.jsonl.gz')
+        record(path, firmware, args.config_lines)
+        recordings.append(path)
+    if not recordings:
+        parser.error('give recordings to replay or --record some')
+
+    data = [['Recording', 'Firmware', 'Step', 'Best (ms)']]
+    for path in recordings:
+        firmware, best = replay(path, args.speed, args.rounds)
+        for step, elapsed in best.items():
+            data.append([os.path.basename(path), firmware, step, f'{elapsed * 1000:.2f}'])
+    column_print(data, separator_char='_')
@@ -0,0 +1,128 @@
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.TransportEngines import SSHEngine
+from CiscoAutomationFramework.FirmwareDetect import detect_firmware
+from CiscoAutomationFramework.ThreadLib import SSH, start_threads, start_pool
+from CiscoAutomationFramework.util import column_print
+from CiscoAutomationFramework import connect_ssh
+from multiprocessing import Process, Queue
+from time import perf_counter
+from threading import Event
+import argparse
+
+username = 'admin'
+password = 'admin'
+
+
+def serve(ports, settings):
+    # The server runs in its own process so it does not compete with the client threads for the GIL
+    with MockCiscoServer(username=username, password=password, **settings) as server:
+        ports.put(server.port)
+        Event().wait()
+
+
+class ShowClock(SSH):
+
+    def during_login(self, ssh):
+        ssh.send_command_get_output('show clock')
+
+
+def timed(function, *args, **kwargs):
+    start = perf_counter()
+    result = function(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def engine(port, deterministic):
+    transport = SSHEngine()
+    transport.deterministic_completion = deterministic
+    transport.connect_to_server('127.0.0.1', username, password, port)
+    return transport
+
+
+def bench_engine(port, commands, deterministic):
+    transport, connect_time = timed(engine, port, deterministic)
+    transport.send_command_get_output('terminal length 0')
+    start = perf_counter()
+    for _ in range(commands):
+        transport.send_command_get_output('show clock')
+    command_time = perf_counter() - start
+    output, output_time = timed(transport.send_command_get_output, 'show running-config', buffer_size=65535,
+                                timeout=5)
+    transport.close_connection()
+    output_bytes = len('\n'.join(output))
+    return [f'SSHEngine (deterministic={deterministic})', 1, f'{connect_time * 1000:.1f}', '',
+            f'{commands / command_time:,.1f}', f'{output_bytes / output_time:,.0f}']
+
+
+def bench_detect_firmware(port, deterministic):
+    transport = engine(port, deterministic)
+    _, detect_time = timed(detect_firmware, transport)
+    transport.close_connection()
+    return [f'detect_firmware (deterministic={deterministic})', 1, f'{detect_time * 1000:.1f}', '', '', '']
+
+
+def bench_connect_ssh(port, commands, deterministic):
+    ssh, connect_time = timed(connect_ssh, '127.0.0.1', username, password, port=port,
+                              deterministic_completion=deterministic)
+    start = perf_counter()
+    for _ in range(commands):
+        ssh.send_command_get_output('show clock')
+    command_time = perf_counter() - start
+    output, output_time = timed(lambda: ssh.running_config)
+    ssh.close_connection()
+    return [f'connect_ssh (deterministic={deterministic})', 1, f'{connect_time * 1000:.1f}', '',
+            f'{commands / command_time:,.1f}', f'{len(output) / output_time:,.0f}']
+
+
+def bench_channels(port, channels):
+    ssh = connect_ssh('127.0.0.1', username, password, port=port, deterministic_completion=True, channels=channels)
+    commands = ['show running-config', 'show mac address-table', 'show ip arp', 'show interfaces']
+    _, elapsed = timed(ssh.send_commands_parallel, commands, timeout=5)
+    ssh.close_connection()
+    return [f'send_commands_parallel (channels={channels})', 1, f'{elapsed * 1000:.1f}', '',
+            f'{len(commands) / elapsed:,.1f}', '']
+
+
+def bench_fan_out(name, runner, port, devices):
+    start = perf_counter()
+    jobs = list(runner(ShowClock, ['127.0.0.1'] * devices, username, password, port=port))
+    elapsed = perf_counter() - start
+    failed = sum(1 for job in jobs if job.exception)
+    return [f'{name} ({failed} failed)' if failed else name, devices, '', f'{devices / elapsed:,.1f}', '', '']
+
+
+def threads_runner(*args, **kwargs):
+    return start_threads(*args, wait_for_threads=True, **kwargs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the transport and threading layers against a mock device')
+    parser.add_argument('--firmware', default='IOS', choices=('IOS', 'IOSXE', 'NXOS'))
+    parser.add_argument('--commands', type=int, default=100, help='commands sent per session')
+    parser.add_argument('--devices', type=int, nargs='+', default=[1, 10, 100], help='simulated device counts')
+    parser.add_argument('--latency', type=float, default=0, help='seconds the mock device waits before answering')
+    parser.add_argument('--config-lines', type=int, default=5000, help='lines in the mock running config')
+    parser.add_argument('--max-workers', type=int, default=50, help='start_pool worker threads')
+    args = parser.parse_args()
+
+    ports = Queue()
+    server = Process(target=serve, args=(ports, {'firmware': args.firmware, 'latency': args.latency,
+                                                 'running_config_lines': args.config_lines}), daemon=True)
+    server.start()
+    port = ports.get(timeout=30)
+
+    data = [['Benchmark', 'Devices', 'Time (ms)', 'Sessions/sec', 'Commands/sec', 'Bytes/sec']]
+    try:
+        for deterministic in (False, True):
+            data.append(bench_engine(port, args.commands, deterministic))
+            data.append(bench_detect_firmware(port, deterministic))
+            data.append(bench_connect_ssh(port, args.commands, deterministic))
+        for channels in (1, 4):
+            data.append(bench_channels(port, channels))
+        for devices in args.devices:
+            data.append(bench_fan_out('start_threads', threads_runner, port, devices))
+            data.append(bench_fan_out('start_pool', lambda *a, **kw: start_pool(*a, max_workers=args.max_workers, **kw),
+                                      port, devices))
+    finally:
+        server.terminate()
+    column_print(data, separator_char='_')
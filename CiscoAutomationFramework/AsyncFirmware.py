@@ -0,0 +1,190 @@
+from CiscoAutomationFramework.AsyncTransportEngines import AsyncBaseEngine
+from CiscoAutomationFramework.TransportEngines import default_buffer, default_timeout, default_command_end
+from CiscoAutomationFramework.Exceptions import EnablePasswordError
+from CiscoAutomationFramework.Parsers import parse_interfaces, parse_mac_address_table, parse_arp_table
+from CiscoAutomationFramework.FirmwareDetect import identify_firmware
+from CiscoAutomationFramework.IOS import IOS
+from CiscoAutomationFramework.IOSXE import IOSXE
+from CiscoAutomationFramework.NXOS import NXOS
+from abc import ABC
+from inspect import getmodule
+
+
+class AsyncCiscoFirmware(ABC):
+
+    # The blocking class for the same firmware, the commands sent and how their output is read come from it
+    firmware = None
+
+    def __init__(self, transport):
+        if not isinstance(transport, AsyncBaseEngine):
+            raise TypeError(f'transport object MUST be an instance of {getmodule(AsyncBaseEngine).__name__}.{AsyncBaseEngine.__name__}')
+        self._terminal_length_value = None
+        self._terminal_width_value = None
+        self.transport = transport
+
+    @property
+    def is_nexus(self) -> bool:
+        return False
+
+    @property
+    def commands_sent(self) -> list:
+        return self.transport.all_commands_sent
+
+    @property
+    def prompt(self) -> str:
+        return self.transport.prompt
+
+    @property
+    def hostname(self) -> str:
+        return self.transport.hostname
+
+    async def cli_to_config_mode(self) -> bool:
+        if self.transport.in_user_exec_mode:
+            await self.cli_to_privileged_exec_mode()
+
+        if self.transport.in_privileged_exec_mode:
+            await self.transport.send_command_get_output('config t')
+
+        return self.transport.in_configuration_mode
+
+    async def cli_to_privileged_exec_mode(self) -> bool:
+        if self.transport.in_privileged_exec_mode:
+            return True
+        if self.transport.in_configuration_mode:
+            await self.transport.send_command_get_output('end')
+            return self.transport.in_privileged_exec_mode
+        if self.transport.in_user_exec_mode:
+            enabling_output = await self.transport.send_command_get_output('enable')
+            if self.transport.prompt not in enabling_output:
+                if not self.transport.enable_password:
+                    raise EnablePasswordError('No enable password provided, network device is asking for one!')
+                await self.transport.send_command(self.transport.enable_password)
+                await self.transport.get_output()
+            return self.transport.in_privileged_exec_mode
+
+    async def send_command_get_output(self, command, end=default_command_end, buffer_size=default_buffer,
+                                      timeout=default_timeout) -> list:
+        return await self.transport.send_command_get_output(command, end, buffer_size, timeout)
+
+    async def send_command(self, command, end=default_command_end) -> None:
+        return await self.transport.send_command(command, end)
+
+    async def get_output(self, buffer_size=default_buffer, timeout=default_timeout) -> list:
+        return await self.transport.get_output(buffer_size, timeout)
+
+    async def close_connection(self) -> None:
+        return await self.transport.close_connection()
+
+    async def terminal_length(self, n='0'):
+        if self._terminal_length_value != int(n):
+            output = await self._terminal_length(n)
+            self._terminal_length_value = int(n)
+            return output
+
+    async def terminal_width(self, n='0'):
+        if self._terminal_width_value != int(n):
+            output = await self._terminal_width(n)
+            self._terminal_width_value = int(n)
+            return output
+
+    async def _show_command(self, command, buffer_size=default_buffer):
+        await self.cli_to_privileged_exec_mode()
+        await self.terminal_length('0')
+        return await self.transport.send_command_get_output(command, buffer_size=buffer_size)
+
+    # Properties return coroutines, so they are used as "await ssh.uptime"
+
+    @property
+    async def uptime(self) -> str:
+        return self.firmware._parse_uptime(await self._show_command('show version'), self.transport.hostname)
+
+    @property
+    async def mac_address_table(self) -> list:
+        return await self._show_command('show mac address-table')
+
+    @property
+    async def arp_table(self) -> list:
+        return await self._show_command('show ip arp')
+
+    @property
+    async def mac_address_entries(self) -> list:
+        return parse_mac_address_table((await self.mac_address_table)[1:-1], self.firmware.parser_firmware)
+
+    @property
+    async def arp_entries(self) -> list:
+        return parse_arp_table((await self.arp_table)[1:-1], self.firmware.parser_firmware)
+
+    @property
+    async def running_config(self) -> str:
+        return '\n'.join(self.firmware._trim_output(await self._show_command('show running-config', buffer_size=1000)))
+
+    @property
+    async def startup_config(self) -> str:
+        return '\n'.join(self.firmware._trim_output(await self._show_command('show startup-config', buffer_size=1000)))
+
+    @property
+    async def interfaces(self) -> list:
+        return [interface.name for interface in await self.interface_entries]
+
+    @property
+    async def interface_entries(self) -> list:
+        return parse_interfaces((await self._show_command(self.firmware.interfaces_command, buffer_size=500))[1:-1])
+
+    async def _terminal_length(self, n='0'):
+        await self.cli_to_privileged_exec_mode()
+        return await self.transport.send_command_get_output(f'terminal length {n}')
+
+    async def _terminal_width(self, n='0'):
+        await self.cli_to_privileged_exec_mode()
+        return await self.transport.send_command_get_output(f'terminal width {n}')
+
+    async def save_config(self):
+        await self.cli_to_privileged_exec_mode()
+        for command, timeout in self.firmware.save_config_commands:
+            data = await self.transport.send_command_get_output(command, timeout=timeout)
+        return self.firmware._config_saved(data, self.transport.prompt)
+
+    async def add_local_user(self, username, password, password_code=0, *args, **kwargs):
+        command_string = self.firmware._add_local_user_command(username, password, password_code, *args, **kwargs)
+        await self.cli_to_config_mode()
+        return await self.transport.send_command_get_output(command_string)
+
+    async def delete_local_user(self, username):
+        await self.cli_to_config_mode()
+        await self.transport.send_command(f'no username {username}')
+        return await self.transport.send_command_get_output('')
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.transport.close_connection()
+
+
+class AsyncIOS(AsyncCiscoFirmware):
+
+    firmware = IOS
+
+
+class AsyncIOSXE(AsyncIOS):
+
+    firmware = IOSXE
+
+
+class AsyncNXOS(AsyncCiscoFirmware):
+
+    firmware = NXOS
+
+    @property
+    def is_nexus(self):
+        return True
+
+
+async def detect_firmware(transport):
+    if not isinstance(transport, AsyncBaseEngine):
+        raise TypeError(f'transport argument MUST be an instance of {getmodule(AsyncBaseEngine).__name__}.{AsyncBaseEngine.__name__}')
+
+    show_version = await transport.send_command_get_truncated_output('show version')
+    firmware_object = {'IOS': AsyncIOS, 'IOSXE': AsyncIOSXE, 'NXOS': AsyncNXOS}.get(identify_firmware(show_version))
+
+    return firmware_object(transport)
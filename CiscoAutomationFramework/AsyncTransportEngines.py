@@ -0,0 +1,178 @@
+from CiscoAutomationFramework.TransportEngines import BaseEngine, default_command_end, default_buffer, default_timeout, \
+    standard_prompt_endings, standard_password_prompts, standard_confirm_prompts, pager_prompt, pager_artifact_pattern
+from CiscoAutomationFramework.Exceptions import AuthenticationException
+from abc import ABC, abstractmethod
+from time import monotonic
+import asyncio
+import asyncssh
+
+
+class AsyncBaseEngine(ABC):
+
+    def __init__(self):
+        self.hostname = ''
+        self._new_hostnames = ()
+        self.prompt = None
+        self.enable_password = None
+        self.commands_sent_since_last_output_get = 0
+        self.all_commands_sent = []
+        self.timeout = 10
+        self._prompt_patterns = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close_connection()
+
+    # Prompt handling is plain string work, so it is shared with the blocking engines
+    _extract_prompt = BaseEngine._extract_prompt
+    _track_hostname_change = BaseEngine._track_hostname_change
+    _rename_hostname = BaseEngine._rename_hostname
+    _get_prompt_patterns = BaseEngine._get_prompt_patterns
+    _starts_with_prompt = BaseEngine._starts_with_prompt
+    _is_prompt = BaseEngine._is_prompt
+    in_user_exec_mode = BaseEngine.in_user_exec_mode
+    in_privileged_exec_mode = BaseEngine.in_privileged_exec_mode
+    in_configuration_mode = BaseEngine.in_configuration_mode
+
+    async def _read_until_prompt(self, buffer_size=default_buffer, timeout=default_timeout, prompts=1, echo=None,
+                                 answer_pager=False):
+        chunks = []
+        pager_window = ''
+        tail = ''
+        prompts_seen = 0
+        echo = echo.strip()[-20:] if echo else ''
+        echo_seen = not echo
+        echo_window = ''
+        end = monotonic() + timeout
+        while True:
+            remaining = end - monotonic()
+            if remaining <= 0:
+                break
+            from_device = await self._get_output(buffer_size, remaining)
+            if not from_device:
+                continue
+            chunks.append(from_device)
+            end = monotonic() + timeout
+            if answer_pager:
+                pager_window = pager_window[-len(pager_prompt):] + from_device
+                if pager_prompt in pager_window:
+                    pager_window = ''
+                    await self._send_command(' ', end='')
+            if not echo_seen:
+                echo_window = echo_window[-len(echo):] + from_device
+                echo_seen = echo in echo_window
+            lines = (tail + from_device).split('\n')
+            tail = lines.pop()
+            prompts_seen += sum(1 for line in lines if self._starts_with_prompt(line))
+            if not echo_seen:
+                continue
+            if self._is_prompt(tail) and prompts_seen + 1 >= prompts:
+                break
+            if echo and tail.strip().endswith(standard_password_prompts + standard_confirm_prompts):
+                break
+        return ''.join(chunks)
+
+    async def _get_output_until_prompt(self, buffer_size=default_buffer, timeout=default_timeout, echo=None):
+        output = ''
+        if self.commands_sent_since_last_output_get:
+            output = await self._read_until_prompt(buffer_size, timeout, self.commands_sent_since_last_output_get, echo)
+        self.commands_sent_since_last_output_get = 0
+        output = output.splitlines()
+        self._extract_prompt(output)
+        return output
+
+    async def send_command(self, command, end=default_command_end):
+        self._track_hostname_change(command)
+        self.commands_sent_since_last_output_get += 1
+        self.all_commands_sent.append(command)
+        return await self._send_command(command, end)
+
+    async def get_output(self, buffer_size=default_buffer, timeout=default_timeout, no_command_sent_previous=False):
+        if no_command_sent_previous:
+            self.commands_sent_since_last_output_get += 1
+        return await self._get_output_until_prompt(buffer_size, timeout)
+
+    async def send_command_get_output(self, command, end=default_command_end, buffer_size=default_buffer,
+                                      timeout=default_timeout):
+        await self.send_command(command, end)
+        return await self._get_output_until_prompt(buffer_size, timeout, echo=command)
+
+    async def send_command_get_truncated_output(self, command, buffer_size=default_buffer, timeout=default_timeout):
+        await self.send_command(command)
+        self.commands_sent_since_last_output_get = 0
+        output = await self._read_until_prompt(buffer_size, timeout, echo=command, answer_pager=True)
+        output = pager_artifact_pattern.sub('', output).splitlines()
+        self._extract_prompt(output)
+        return output
+
+    async def _get_prompt_and_hostname(self, timeout=default_timeout):
+        output = ''
+        # However often the device is nudged, it only gets the connect timeout in all to show a prompt
+        end = monotonic() + self.timeout
+        while not output.endswith(standard_prompt_endings):
+            remaining = end - monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f'No prompt was received within {self.timeout} seconds')
+            data = await self._get_output(1000, min(timeout, remaining))
+            if not data:
+                # Nothing more is coming, nudge the device into printing a fresh prompt
+                await self._send_command('', end='\n')
+                continue
+            output += data
+            if '% Authorization failed.' in output:
+                raise AuthenticationException('% Authorization failed.')
+
+        prompt = output.splitlines()[-1].strip()
+        hostname = prompt[:-1]
+        return prompt, hostname
+
+    @abstractmethod
+    async def connect_to_server(self, ip, username, password, port) -> bool:
+        pass
+
+    @abstractmethod
+    async def _send_command(self, command, end) -> None:
+        pass
+
+    @abstractmethod
+    async def _get_output(self, buffer_size, timeout) -> str:
+        pass
+
+    @abstractmethod
+    async def close_connection(self) -> None:
+        pass
+
+
+class AsyncSSHEngine(AsyncBaseEngine):
+
+    def __init__(self):
+        super().__init__()
+        self.connection = None
+        self.shell = None
+
+    async def connect_to_server(self, ip, username, password, port):
+        self.connection = await asyncio.wait_for(
+            asyncssh.connect(ip, port=port, username=username, password=password, known_hosts=None),
+            self.timeout
+        )
+        self.shell = await self.connection.create_process(term_type='vt100', errors='replace')
+        self.prompt, self.hostname = await self._get_prompt_and_hostname()
+
+    async def _get_output(self, buffer_size, timeout):
+        try:
+            data = await asyncio.wait_for(self.shell.stdout.read(buffer_size), timeout)
+        except asyncio.TimeoutError:
+            return ''
+        if not data and self.shell.stdout.at_eof():
+            raise ConnectionError('Connection closed by the remote device')
+        return data
+
+    async def _send_command(self, command, end='\n'):
+        self.shell.stdin.write(f'{command}{end}')
+
+    async def close_connection(self):
+        if self.connection:
+            self.connection.close()
+            await self.connection.wait_closed()
@@ -0,0 +1,129 @@
+from typing import NamedTuple
+from difflib import unified_diff
+from hashlib import sha256
+from threading import Lock
+from urllib.parse import quote, unquote
+from time import time
+import json
+import zlib
+import os
+import re
+
+# Lines that change on every run without the configuration itself changing
+volatile_line_pattern = re.compile(
+    r'^(! Last configuration change at |! NVRAM config last updated at |! No configuration change since last restart'
+    r'|!Time: |!Running configuration last done at: |!Command: show |ntp clock-period |Current configuration : '
+    r'|Building configuration\.\.\.)'
+)
+
+
+class Snapshot(NamedTuple):
+    timestamp: float
+    kind: str
+    digest: str
+    hostname: str
+
+
+def normalize_config(config):
+    if isinstance(config, str):
+        config = config.splitlines()
+    lines = [line.rstrip() for line in config if not volatile_line_pattern.match(line)]
+    while lines and not lines[0]:
+        lines.pop(0)
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines) + '\n'
+
+
+class ConfigBackupStore:
+
+    def __init__(self, path, compression_level=9):
+        self.path = path
+        self.compression_level = compression_level
+        self._objects_path = os.path.join(path, 'objects')
+        self._index_path = os.path.join(path, 'index')
+        os.makedirs(self._objects_path, exist_ok=True)
+        os.makedirs(self._index_path, exist_ok=True)
+        self._latest = {}
+        self._lock = Lock()
+
+    def _object_file(self, digest):
+        return os.path.join(self._objects_path, digest[:2], digest[2:])
+
+    def _index_file(self, device):
+        return os.path.join(self._index_path, f'{quote(device, safe="")}.jsonl')
+
+    def _write_object(self, digest, config):
+        object_file = self._object_file(digest)
+        if os.path.exists(object_file):
+            return False
+        os.makedirs(os.path.dirname(object_file), exist_ok=True)
+        temp_file = f'{object_file}.{os.getpid()}.tmp'
+        with open(temp_file, 'wb') as file:
+            file.write(zlib.compress(config.encode(), self.compression_level))
+        os.replace(temp_file, object_file)
+        return True
+
+    def _latest_digest(self, device, kind):
+        if (device, kind) not in self._latest:
+            for snapshot in self.snapshots(device):
+                self._latest[(device, snapshot.kind)] = snapshot.digest
+            self._latest.setdefault((device, kind), None)
+        return self._latest[(device, kind)]
+
+    def store(self, device, config, kind='running', hostname='', timestamp=None) -> tuple:
+        config = normalize_config(config)
+        digest = sha256(config.encode()).hexdigest()
+        with self._lock:
+            latest_digest = self._latest_digest(device, kind)
+        # An unchanged config costs a hash and nothing else, not a single byte is written
+        if latest_digest == digest:
+            return digest, False
+        self._write_object(digest, config)
+        snapshot = Snapshot(timestamp or time(), kind, digest, hostname)
+        with self._lock:
+            with open(self._index_file(device), 'a') as file:
+                file.write(json.dumps(snapshot._asdict()) + '\n')
+            self._latest[(device, kind)] = digest
+        return digest, True
+
+    def backup(self, firmware, device=None, startup=False) -> dict:
+        device = device or firmware.hostname
+        changed = {'running': self.store(device, firmware.running_config, 'running', firmware.hostname)[1]}
+        if startup:
+            changed['startup'] = self.store(device, firmware.startup_config, 'startup', firmware.hostname)[1]
+        return changed
+
+    def devices(self) -> list:
+        return sorted(unquote(name[:-len('.jsonl')]) for name in os.listdir(self._index_path) if name.endswith('.jsonl'))
+
+    def snapshots(self, device, kind=None) -> list:
+        index_file = self._index_file(device)
+        if not os.path.exists(index_file):
+            return []
+        with open(index_file) as file:
+            snapshots = [Snapshot(**json.loads(line)) for line in file if line.strip()]
+        return [snapshot for snapshot in snapshots if kind is None or snapshot.kind == kind]
+
+    def latest(self, device, kind='running'):
+        snapshots = self.snapshots(device, kind)
+        return snapshots[-1] if snapshots else None
+
+    def load(self, digest) -> str:
+        with open(self._object_file(digest), 'rb') as file:
+            return zlib.decompress(file.read()).decode()
+
+    def _resolve(self, device, snapshot, kind):
+        if isinstance(snapshot, Snapshot):
+            return snapshot.digest
+        if isinstance(snapshot, int):
+            return self.snapshots(device, kind)[snapshot].digest
+        return snapshot
+
+    def diff(self, device, old=-2, new=-1, kind='running', context=3) -> list:
+        old_digest = self._resolve(device, old, kind)
+        new_digest = self._resolve(device, new, kind)
+        if old_digest == new_digest:
+            return []
+        return list(unified_diff(self.load(old_digest).splitlines(), self.load(new_digest).splitlines(),
+                                 old_digest[:12], new_digest[:12], lineterm='', n=context))
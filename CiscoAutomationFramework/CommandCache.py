@@ -0,0 +1,57 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+cacheable_prefixes = ('show ', 'sh ')
+
+
+class CommandCache:
+
+    def __init__(self, default_ttl=60, ttls=None, max_entries=256):
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def is_cacheable(command):
+        return command.strip().lower().startswith(cacheable_prefixes)
+
+    def ttl_for(self, command):
+        # The longest configured prefix wins, so 'show mac' can override a broader 'show' entry
+        matches = [prefix for prefix in self.ttls if command.startswith(prefix)]
+        if matches:
+            return self.ttls[max(matches, key=len)]
+        return self.default_ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, output = entry
+            if monotonic() > expires:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(output)
+
+    def set(self, key, command, output):
+        ttl = self.ttl_for(command)
+        if not ttl:
+            return
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl, list(output))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,53 @@
+from typing import NamedTuple
+from uuid import uuid4
+import re
+
+config_error_pattern = re.compile(r'^\s*%\s*\S')
+push_error_actions = ('continue', 'stop', 'rollback')
+
+
+class ConfigLineError(NamedTuple):
+    line_number: int
+    line: str
+    messages: list
+
+
+class ConfigPushResult:
+
+    def __init__(self, hostname, lines):
+        self.hostname = hostname
+        self.lines = lines
+        self.outputs = []
+        self.errors = []
+        self.lines_sent = 0
+        self.stopped = False
+        self.rolled_back = False
+
+    @property
+    def success(self) -> bool:
+        return not self.errors
+
+    def __repr__(self):
+        return (f'<ConfigPushResult {self.hostname} lines_sent={self.lines_sent}/{len(self.lines)} '
+                f'errors={len(self.errors)} stopped={self.stopped} rolled_back={self.rolled_back}>')
+
+
+def config_lines(config):
+    if isinstance(config, str):
+        config = config.splitlines()
+    # Blank lines and ! comments do nothing on the device but would still cost a prompt each
+    return [line.rstrip() for line in config if line.strip() and not line.strip().startswith('!')]
+
+
+def find_config_errors(lines, outputs, first_line_number=1):
+    errors = []
+    for line_number, (line, output) in enumerate(zip(lines, outputs), first_line_number):
+        messages = [message.strip() for message in output if config_error_pattern.match(message)]
+        if messages:
+            errors.append(ConfigLineError(line_number, line, messages))
+    return errors
+
+
+def rollback_point_name():
+    # Every push saves its own, so two pushes to one device never restore or delete each other's
+    return f'caf_push_{uuid4().hex[:12]}'
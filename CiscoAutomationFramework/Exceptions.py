@@ -5,4 +5,18 @@ class AuthenticationException(Exception):
     pass
 
 class ParserError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ConfigPushError(Exception):
+    pass
+
+class DeviceUnreachable(Exception):
+
+    def __init__(self, ip, port, reason):
+        super().__init__(f'{ip}:{port} is unreachable, {reason}')
+        self.ip = ip
+        self.port = port
+        self.reason = reason
+
+class ReplayError(Exception):
+    pass
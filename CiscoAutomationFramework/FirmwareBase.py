@@ -1,26 +1,57 @@
-from CiscoAutomationFramework.TransportEngines import BaseEngine, default_buffer, default_timeout, default_command_end, default_delay
-from CiscoAutomationFramework.Exceptions import EnablePasswordError
+from CiscoAutomationFramework.TransportEngines import BaseEngine, default_buffer, default_timeout, default_command_end, default_delay, \
+    check_unique_commands
+from CiscoAutomationFramework.Exceptions import EnablePasswordError, ConfigPushError
+from CiscoAutomationFramework.Parsers import parse_mac_address_table, parse_arp_table
+from CiscoAutomationFramework.CommandCache import CommandCache
+from CiscoAutomationFramework.ConfigPush import ConfigPushResult, config_lines, find_config_errors, push_error_actions
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from inspect import getmodule
+import re
+
+terminal_setting_pattern = re.compile(r'^\s*term\w*\s+(len|wid)\w*\s+(\d+)\s*$')
 
 class CiscoFirmware(ABC):
+
+    parser_firmware = 'IOS'
+
     def __init__(self, transport):
         if not isinstance(transport, BaseEngine):
             raise TypeError(f'transport object MUST be an instance of {getmodule(BaseEngine).__name__}.{BaseEngine.__name__}')
         self._terminal_length_value = None
         self._terminal_width_value = None
         self.transport = transport
+        self._session_state_hostname = transport.hostname
+        self.command_cache = None
+        self._channels = []
         # self.terminal_length()
 
     @property
     def is_nexus(self) -> bool:
         return False
     
+    @property
+    def commands_sent(self) -> list:
+        return self.transport.all_commands_sent
+
     @property
     def commands_send(self) -> list:
-        return self.transport.all_commands_send
+        return self.commands_sent
     
+    def enable_command_cache(self, default_ttl=60, ttls=None, max_entries=256) -> CommandCache:
+        self.command_cache = CommandCache(default_ttl, ttls, max_entries)
+        return self.command_cache
+
+    def disable_command_cache(self) -> None:
+        self.command_cache = None
+
+    def invalidate_command_cache(self) -> None:
+        if self.command_cache:
+            self.command_cache.invalidate()
+
     def cli_to_config_mode(self) -> bool:
+        self.invalidate_command_cache()
         if self.transport.in_user_exec_mode:
             self.cli_to_privileged_exec_mode()
 
@@ -40,22 +71,213 @@ class CiscoFirmware(ABC):
             if self.transport.prompt not in enabling_output:
                 if not self.transport.enable_password:
                     raise EnablePasswordError('No enable password provided, network device is asking for one!')
-                self.transport.send_command_get_output(self.transport.enable_password)
+                # Passwords are not echoed back, so read up to the prompt without waiting on an echo
+                self.transport.send_command(self.transport.enable_password)
+                self.transport.get_output()
                 return self.transport.in_privileged_exec_mode
             
+    @property
+    def mode(self) -> str:
+        if self.transport.in_configuration_mode:
+            return 'config'
+        if self.transport.in_privileged_exec_mode:
+            return 'privileged'
+        if self.transport.in_user_exec_mode:
+            return 'user'
+
+    @property
+    def context(self) -> str:
+        if self.transport.in_configuration_mode:
+            return self.transport.prompt[self.transport.prompt.rfind('(') + 1:-2]
+
+    @property
+    def session_state(self) -> dict:
+        self._sync_session_state()
+        return {'hostname': self.hostname, 'mode': self.mode, 'context': self.context,
+                'terminal_length': self._terminal_length_value, 'terminal_width': self._terminal_width_value}
+
+    def _sync_session_state(self):
+        # Terminal settings belong to the session on the device, hopping through a jumphost starts a new one
+        if self._session_state_hostname != self.transport.hostname:
+            self._session_state_hostname = self.transport.hostname
+            self._terminal_length_value = None
+            self._terminal_width_value = None
+
+    def _track_command(self, command):
+        match = terminal_setting_pattern.match(command)
+        if match:
+            self._sync_session_state()
+            if match.group(1) == 'len':
+                self._terminal_length_value = int(match.group(2))
+            else:
+                self._terminal_width_value = int(match.group(2))
+            return
+        # Anything other than a show command may change what the device would show next
+        if self.command_cache and not self.command_cache.is_cacheable(command):
+            self.command_cache.invalidate()
+
     @property
     def prompt(self) -> str:
         return self.transport.prompt
     
     @property
-    def hostname(self) -> srt:
+    def hostname(self) -> str:
         return self.transport.hostname
     
     def send_command_get_output(self, command, end=default_command_end, buffer_size=default_buffer,
                                 timeout=default_timeout, delay=default_delay) -> list:
-        return self.transport.send_command_get_output(command, end, buffer_size, timeout, delay)
+        self._track_command(command)
+        if not self.command_cache or not self.command_cache.is_cacheable(command):
+            return self.transport.send_command_get_output(command, end, buffer_size, timeout, delay)
+
+        key = (self.transport.hostname, command, end)
+        output = self.command_cache.get(key)
+        if output is None:
+            output = self.transport.send_command_get_output(command, end, buffer_size, timeout, delay)
+            self.command_cache.set(key, command, output)
+        return output
         
+    def send_commands_get_output(self, commands, end=default_command_end, buffer_size=default_buffer,
+                                 timeout=default_timeout) -> dict:
+        commands = list(commands)
+        check_unique_commands(commands)
+        for command in commands:
+            self._track_command(command)
+        if not self.command_cache:
+            return self.transport.send_commands_get_output(commands, end, buffer_size, timeout)
+
+        outputs = {}
+        for command in commands:
+            if self.command_cache.is_cacheable(command):
+                output = self.command_cache.get((self.transport.hostname, command, end))
+                if output is not None:
+                    outputs[command] = output
+        missing = [command for command in commands if command not in outputs]
+        for command, output in self.transport.send_commands_get_output(missing, end, buffer_size, timeout).items():
+            if self.command_cache.is_cacheable(command):
+                self.command_cache.set((self.transport.hostname, command, end), command, output)
+            outputs[command] = output
+        return {command: outputs[command] for command in commands}
+
+    def _open_channels(self, count):
+        # Each extra shell gets a firmware object of its own, CLI mode and terminal settings are per shell
+        while len(self._channels) < count:
+            self._channels.append(type(self)(self.transport.open_shell_channel()))
+        for channel in self._channels:
+            channel.command_cache = self.command_cache
+        return self._channels[:count]
+
+    def _drain_commands(self, commands, outputs, buffer_size, timeout):
+        self.cli_to_privileged_exec_mode()
+        self.terminal_length('0')
+        while True:
+            try:
+                command = commands.popleft()
+            except IndexError:
+                return
+            outputs[command] = self.send_command_get_output(command, buffer_size=buffer_size, timeout=timeout)
+
+    def send_commands_parallel(self, commands, buffer_size=default_buffer, timeout=default_timeout) -> dict:
+        commands = list(commands)
+        check_unique_commands(commands)
+        if not all(CommandCache.is_cacheable(command) for command in commands):
+            raise ValueError('Only show commands can be spread across shell channels')
+        channel_count = min(self.transport.max_channels, len(commands))
+        if channel_count <= 1:
+            self.cli_to_privileged_exec_mode()
+            self.terminal_length('0')
+            return self.send_commands_get_output(commands, buffer_size=buffer_size, timeout=timeout)
+
+        # Every shell takes the next command as soon as it is done with its last, so one slow command
+        # does not hold back the ones queued behind it
+        pending = deque(commands)
+        outputs = {}
+        shells = [self] + self._open_channels(channel_count - 1)
+        with ThreadPoolExecutor(max_workers=len(shells)) as executor:
+            futures = [executor.submit(shell._drain_commands, pending, outputs, buffer_size, timeout) for shell in shells]
+        failed = [(shell, future.exception()) for shell, future in zip(shells, futures) if future.exception()]
+        for shell, _ in failed:
+            # A shell that failed part way through a command is in an unknown state, it is not used again
+            if shell is not self:
+                self._channels.remove(shell)
+                shell.close_connection()
+        if failed:
+            raise failed[0][1]
+        return {command: outputs[command] for command in commands}
+
+    def iter_command_output(self, command, end=default_command_end, buffer_size=default_buffer,
+                            timeout=default_timeout):
+        return self.transport.send_command_iter_output(command, end, buffer_size, timeout)
+
+    def write_command_output(self, command, file, end=default_command_end, buffer_size=default_buffer,
+                             timeout=default_timeout) -> int:
+        lines_written = 0
+        for line in self.iter_command_output(command, end, buffer_size, timeout):
+            file.write(f'{line}\n')
+            lines_written += 1
+        return lines_written
+
+    def push_config(self, config, on_error='continue', batch_size=None, buffer_size=default_buffer,
+                    timeout=default_timeout) -> ConfigPushResult:
+        if on_error not in push_error_actions:
+            raise ValueError(f'on_error must be one of {", ".join(push_error_actions)}')
+        lines = config_lines(config)
+        result = ConfigPushResult(self.hostname, lines)
+        if not lines:
+            return result
+
+        rollback_point = None
+        if on_error == 'rollback':
+            self.cli_to_privileged_exec_mode()
+            rollback_point = self._create_rollback_point()
+            if not rollback_point:
+                raise ConfigPushError(f'Unable to save a rollback point on {self.hostname}, nothing was pushed')
+
+        # Each batch goes out in a single write and is read back in one pass, split up on the prompts. Lines
+        # after a failing one in the same batch have already gone out, so unless the caller chose a batch size
+        # a push that stops on errors goes out a line at a time
+        if not batch_size:
+            batch_size = len(lines) if on_error == 'continue' else 1
+        pushed = False
+        try:
+            if not self.cli_to_config_mode():
+                raise ConfigPushError(f'Unable to enter configuration mode on {self.hostname}')
+            for start in range(0, len(lines), batch_size):
+                batch = lines[start:start + batch_size]
+                outputs = self.transport.send_commands_get_output_list(batch, buffer_size=buffer_size, timeout=timeout)
+                errors = find_config_errors(batch, outputs, start + 1)
+                result.outputs += outputs
+                result.errors += errors
+                result.lines_sent += len(batch)
+                if errors and on_error != 'continue':
+                    result.stopped = result.lines_sent < len(lines)
+                    break
+            self.cli_to_privileged_exec_mode()
+            pushed = True
+        finally:
+            self.invalidate_command_cache()
+            if rollback_point:
+                # A push cut short by an exception is rolled back like one that hit an error, and the
+                # rollback point never outlives the push
+                try:
+                    if result.errors or not pushed:
+                        result.rolled_back = self._rollback(rollback_point)
+                finally:
+                    self._discard_rollback_point(rollback_point)
+        return result
+
+    @staticmethod
+    def _trim_output(lines, head=2, tail=2):
+        held_back = deque()
+        for index, line in enumerate(lines):
+            if index < head:
+                continue
+            held_back.append(line)
+            if len(held_back) > tail:
+                yield held_back.popleft()
+
     def send_command(self, command, end=default_command_end) -> None:
+        self._track_command(command)
         return self.transport.send_command(command, end)
 
     def get_output(self, buffer_size=default_buffer, timeout=default_timeout) -> list:
@@ -67,27 +289,34 @@ class CiscoFirmware(ABC):
         question_output = self.send_command_get_output(command, end=' ?')
 
     def close_connection(self) -> None:
+        for channel in self._channels:
+            channel.close_connection()
+        self._channels = []
         return self.transport.close_connection()
 
 
     def terminal_length(self, n='0'):
-        if self._terminal_length_value:
-            if self._terminal_length_value != int(n):
-                self._terminal_length_value = int(n)
-                return self._terminal_length(n)
-        else:
+        self._sync_session_state()
+        if self._terminal_length_value != int(n):
+            output = self._terminal_length(n)
             self._terminal_length_value = int(n)
-            return self._terminal_length(n)
+            return output
 
     def terminal_width(self, n='0'):
-        if self._terminal_width_value:
-            if self._terminal_width_value != int(n):
-                self._terminal_width_value = int(n)
-                return self._terminal_width(n)
-        else:
+        self._sync_session_state()
+        if self._terminal_width_value != int(n):
+            output = self._terminal_width(n)
             self._terminal_width_value = int(n)
-            return self._terminal_width(n)
-        
+            return output
+
+    @property
+    def mac_address_entries(self) -> list:
+        return parse_mac_address_table(self.mac_address_table[1:-1], self.parser_firmware)
+
+    @property
+    def arp_entries(self) -> list:
+        return parse_arp_table(self.arp_table[1:-1], self.parser_firmware)
+
     # Begin abstract properties
 
     @property
@@ -100,6 +329,11 @@ class CiscoFirmware(ABC):
     def interfaces(self) -> list:
         pass
 
+    @property
+    @abstractmethod
+    def interface_entries(self) -> list:
+        pass
+
     @property
     @abstractmethod
     def mac_address_table(self) -> str:
@@ -134,6 +368,18 @@ class CiscoFirmware(ABC):
     def save_config(self):
         pass
 
+    @abstractmethod
+    def _create_rollback_point(self):
+        pass
+
+    @abstractmethod
+    def _rollback(self, rollback_point):
+        pass
+
+    @abstractmethod
+    def _discard_rollback_point(self, rollback_point):
+        pass
+
     @abstractmethod
     def add_local_user(self, username, password, password_code=0, *args, **kwargs):
         pass
@@ -146,4 +392,4 @@ class CiscoFirmware(ABC):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.transport.close_connection()
\ No newline at end of file
+        self.close_connection()
\ No newline at end of file
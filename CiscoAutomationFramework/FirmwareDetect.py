@@ -3,14 +3,132 @@ from CiscoAutomationFramework.IOS import IOS
 from CiscoAutomationFramework.IOSXE import IOSXE
 from CiscoAutomationFramework.NXOS import NXOS
 from inspect import getmodule
-from time import sleep
+from threading import Lock
+from time import time, perf_counter, monotonic, sleep
+from uuid import uuid4
+import atexit
+import json
+import os
 
-def detect_firmware(transport):
-    if not isinstance(transport, BaseEngine):
-        raise TypeError(f'transport argument MUST be an instance of {getmodule(BaseEngine).__name__}.{BaseEngine.__name__}')
 
-    show_version = transport.send_command_get_truncated_output('show version')
+firmware_classes = {'IOS': IOS, 'IOSXE': IOSXE, 'NXOS': NXOS}
+
+
+class FirmwareCache:
+
+    def __init__(self, path, ttl=7 * 24 * 60 * 60, lock_timeout=5):
+        self.path = path
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._lock = Lock()
+        self._entries = self._read()
+        self._removed = {}
+        self._dirty = False
+        # Detections are kept in memory and written out once, when the cache is flushed or at the latest on exit
+        atexit.register(self.flush)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.flush()
+
+    def _read(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path) as file:
+            return json.load(file)
+
+    def _lock_file(self, timeout=5, stale_after=60):
+        # Processes sharing the file take turns merging into it. A lock is only broken once it is older than
+        # any flush takes, which means the process holding it is gone
+        lock_path = f'{self.path}.lock'
+        token = f'{os.getpid()} {uuid4().hex}'
+        deadline = monotonic() + timeout
+        while True:
+            try:
+                descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                pass
+            else:
+                with os.fdopen(descriptor, 'w') as file:
+                    file.write(token)
+                return lock_path, token
+            try:
+                if time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            if monotonic() >= deadline:
+                return None
+            sleep(.01)
+
+    @staticmethod
+    def _unlock_file(lock_path, token):
+        # A lock that was broken and taken over by another process while this one held it is left alone
+        try:
+            with open(lock_path) as file:
+                if file.read() != token:
+                    return
+            os.remove(lock_path)
+        except FileNotFoundError:
+            pass
 
+    def flush(self):
+        with self._lock:
+            if not self._dirty:
+                return False
+            lock = self._lock_file(self.lock_timeout)
+            if not lock:
+                # Left dirty, so the next flush (at the latest the one on exit) tries again
+                return False
+            try:
+                # Other processes may have flushed since the file was read, the newer of two entries wins
+                entries = self._read()
+                for host, removed in self._removed.items():
+                    if host in entries and entries[host]['detected'] <= removed:
+                        del entries[host]
+                for host, entry in self._entries.items():
+                    if host not in entries or entries[host]['detected'] <= entry['detected']:
+                        entries[host] = entry
+                temp_path = f'{self.path}.{os.getpid()}.{uuid4().hex}.tmp'
+                with open(temp_path, 'w') as file:
+                    json.dump(entries, file)
+                os.replace(temp_path, self.path)
+            finally:
+                self._unlock_file(*lock)
+            self._entries = entries
+            self._removed = {}
+            self._dirty = False
+            return True
+
+    def get(self, host, transport):
+        with self._lock:
+            entry = self._entries.get(host)
+        if not entry:
+            return None
+        # A different hostname means the device behind this address was replaced, so detect again
+        if time() - entry['detected'] > self.ttl or entry['hostname'] != transport.hostname:
+            self.invalidate(host)
+            return None
+        firmware_object = firmware_classes.get(entry['firmware'])
+        return firmware_object(transport) if firmware_object else None
+
+    def set(self, host, firmware):
+        with self._lock:
+            self._entries[host] = {'firmware': type(firmware).__name__, 'hostname': firmware.hostname, 'detected': time()}
+            self._removed.pop(host, None)
+            self._dirty = True
+
+    def invalidate(self, host):
+        with self._lock:
+            if self._entries.pop(host, None):
+                self._removed[host] = time()
+                self._dirty = True
+
+
+def identify_firmware(show_version):
     results = {'IOSXE': 0, 'IOS': 0, 'NXOS': 0, 'ASA': 0}
     for line in show_version[:10]:
         if 'ios-xe' in line.lower() or 'ios xe' in line.lower():
@@ -21,8 +139,18 @@ def detect_firmware(transport):
             results['NXOS'] += 1
         elif 'adaptive security appliance' in line.lower():
             results['ASA'] += 1
+    return max(results, key=results.get)
+
+
+def detect_firmware(transport):
+    if not isinstance(transport, BaseEngine):
+        raise TypeError(f'transport argument MUST be an instance of {getmodule(BaseEngine).__name__}.{BaseEngine.__name__}')
+
+    start = perf_counter()
+    # Only the first 10 lines are inspected, so there is no need to page through the rest
+    show_version = transport.send_command_get_head('show version', lines=10)
 
-    firmware_version = max(results, key=results.get)
-    firmware_object = {'IOS': IOS, 'IOSXE': IOSXE, 'NXOS': NXOS}.get(firmware_version)
+    firmware_object = firmware_classes.get(identify_firmware(show_version))
+    transport._record_phase('firmware_detection', perf_counter() - start)
 
-    return firmware_object
\ No newline at end of file
+    return firmware_object(transport)
\ No newline at end of file
@@ -0,0 +1,248 @@
+from typing import NamedTuple
+from collections import Counter
+from itertools import chain, count
+from array import array
+from hashlib import sha1
+from socket import inet_aton, inet_ntoa
+import json
+import zlib
+import sys
+import os
+import re
+
+snapshot_version = 1
+mac_digits_pattern = re.compile(r'[^0-9a-fA-F]')
+
+
+class MacLocation(NamedTuple):
+    device: str
+    interface: str
+    vlan: int
+
+
+def mac_to_int(mac):
+    digits = mac_digits_pattern.sub('', mac)
+    if len(digits) != 12:
+        raise ValueError(f'{mac!r} is not a MAC address')
+    return int(digits, 16)
+
+
+def int_to_mac(value):
+    digits = f'{value:012x}'
+    return f'{digits[:4]}.{digits[4:8]}.{digits[8:]}'
+
+
+def ip_to_int(ip):
+    return int.from_bytes(inet_aton(ip), 'big')
+
+
+def int_to_ip(value):
+    return inet_ntoa(value.to_bytes(4, 'big'))
+
+
+def _vlan(vlan):
+    return int(vlan) if vlan.isdigit() else 0
+
+
+class FleetIndex:
+
+    def __init__(self):
+        self.macs = {}
+        self.ips = {}
+        self._ip_counts = {}
+        self.hostnames = {}
+        self._device_macs = {}
+        self._device_ips = {}
+        self._digests = {}
+        self._port_counts = {}
+        self._strings = {}
+        self._locations = {}
+
+    def __len__(self):
+        return len(self.macs)
+
+    @property
+    def devices(self):
+        return list(self._digests)
+
+    def _intern(self, string):
+        return self._strings.setdefault(string, string)
+
+    def _intern_location(self, location):
+        # A port carries many addresses, they all share the one location tuple
+        return self._locations.setdefault(location, location)
+
+    def _add_location(self, mac, location):
+        self.macs.setdefault(mac, []).append(location)
+        port = (location.device, location.interface)
+        self._port_counts[port] = self._port_counts.get(port, 0) + 1
+
+    def remove(self, device):
+        device_macs, device_locations = self._device_macs.pop(device, ((), ()))
+        for mac, location in zip(device_macs, device_locations):
+            locations = self.macs[mac]
+            locations.remove(location)
+            if not locations:
+                del self.macs[mac]
+            port = (location.device, location.interface)
+            self._port_counts[port] -= 1
+            if not self._port_counts[port]:
+                del self._port_counts[port]
+        for ip, mac in zip(*self._device_ips.pop(device, ((), ()))):
+            self._ip_counts[ip] -= 1
+            if not self._ip_counts[ip]:
+                del self._ip_counts[ip]
+                del self.ips[ip]
+            elif self.ips[ip] == mac:
+                # Another device still has the address (HSRP, VRRP), what it learned is what stays
+                self.ips[ip] = self._other_mac_for_ip(ip, mac)
+        self._digests.pop(device, None)
+        self.hostnames.pop(device, None)
+
+    def _other_mac_for_ip(self, ip, default):
+        for device_ips, device_ip_macs in self._device_ips.values():
+            try:
+                return device_ip_macs[device_ips.index(ip)]
+            except ValueError:
+                continue
+        return default
+
+    @staticmethod
+    def _digest(mac_entries, arp_entries):
+        digest = sha1()
+        for entry in sorted(mac_entries) + [()] + sorted(arp_entries):
+            digest.update('\0'.join(entry).encode())
+            digest.update(b'\n')
+        return digest.hexdigest()
+
+    def update(self, device, mac_entries, arp_entries, hostname=None) -> bool:
+        mac_entries = [tuple(entry) for entry in mac_entries]
+        arp_entries = [tuple(entry) for entry in arp_entries]
+        digest = self._digest(mac_entries, arp_entries)
+        if self._digests.get(device) == digest:
+            return False
+
+        # Only the entries of the device that changed are touched, the rest of the index stays as it is
+        self.remove(device)
+        device = self._intern(device)
+        device_macs, device_locations = array('Q'), []
+        for vlan, mac_address, _, interface in mac_entries:
+            mac = mac_to_int(mac_address)
+            location = self._intern_location(MacLocation(device, self._intern(interface), _vlan(vlan)))
+            self._add_location(mac, location)
+            device_macs.append(mac)
+            device_locations.append(location)
+        device_ips, device_ip_macs = array('I'), array('Q')
+        for ip_address, _, mac_address, _ in arp_entries:
+            try:
+                ip = ip_to_int(ip_address)
+            except OSError:
+                continue
+            mac = mac_to_int(mac_address)
+            self.ips[ip] = mac
+            self._ip_counts[ip] = self._ip_counts.get(ip, 0) + 1
+            device_ips.append(ip)
+            device_ip_macs.append(mac)
+        self._device_macs[device] = (device_macs, device_locations)
+        self._device_ips[device] = (device_ips, device_ip_macs)
+        self._digests[device] = digest
+        if hostname:
+            self.hostnames[device] = hostname
+        return True
+
+    def locate_mac(self, mac) -> list:
+        return list(self.macs.get(mac_to_int(mac), ()))
+
+    def edge_location(self, mac):
+        # Trunks and uplinks learn many addresses, the port with the fewest is where the host is plugged in
+        locations = self.macs.get(mac_to_int(mac))
+        if not locations:
+            return None
+        return min(locations, key=lambda location: self._port_counts[(location.device, location.interface)])
+
+    def mac_for_ip(self, ip):
+        mac = self.ips.get(ip_to_int(ip))
+        return int_to_mac(mac) if mac is not None else None
+
+    def locate_ip(self, ip) -> list:
+        mac = self.ips.get(ip_to_int(ip))
+        return list(self.macs.get(mac, ())) if mac is not None else []
+
+    def collect(self, ips, username, password, enable_password=None, max_workers=50, **kwargs) -> dict:
+        # Loading and querying a snapshot does not need paramiko, only collecting does
+        from CiscoAutomationFramework.ThreadLib import collect_tables
+
+        results = {}
+        for job in collect_tables(ips, username, password, enable_password=enable_password, max_workers=max_workers,
+                                  **kwargs):
+            if job.exception:
+                results[job.ip] = job.exception
+            else:
+                results[job.ip] = self.update(job.ip, job.mac_entries, job.arp_entries, job.hostname)
+        return results
+
+    def save(self, path):
+        used_locations = dict.fromkeys(chain.from_iterable(locations for _, locations in self._device_macs.values()))
+        location_ids = dict(zip(used_locations, count()))
+        mac_column, location_column, ip_column, ip_mac_column = array('Q'), array('I'), array('I'), array('Q')
+        devices = {}
+        for device, (device_macs, device_locations) in self._device_macs.items():
+            device_ips, device_ip_macs = self._device_ips[device]
+            devices[device] = {'digest': self._digests[device], 'hostname': self.hostnames.get(device),
+                               'macs': len(device_macs), 'ips': len(device_ips)}
+            mac_column.extend(device_macs)
+            location_column.extend(map(location_ids.__getitem__, device_locations))
+            ip_column.extend(device_ips)
+            ip_mac_column.extend(device_ip_macs)
+
+        columns = (mac_column, location_column, ip_column, ip_mac_column)
+        header = json.dumps({'version': snapshot_version, 'byteorder': sys.byteorder, 'devices': devices,
+                             'locations': list(location_ids), 'lengths': [len(column) for column in columns]}).encode()
+        data = b''.join([len(header).to_bytes(4, 'big'), header] + [column.tobytes() for column in columns])
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(zlib.compress(data, 1))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as file:
+            data = memoryview(zlib.decompress(file.read()))
+        header_length = int.from_bytes(data[:4], 'big')
+        header = json.loads(bytes(data[4:4 + header_length]))
+        if header['version'] != snapshot_version:
+            raise ValueError(f'{path} is a version {header["version"]} snapshot, expected {snapshot_version}')
+
+        columns = []
+        offset = 4 + header_length
+        for typecode, length in zip('QIIQ', header['lengths']):
+            column = array(typecode)
+            column.frombytes(data[offset:offset + length * column.itemsize])
+            if header['byteorder'] != sys.byteorder:
+                column.byteswap()
+            offset += length * column.itemsize
+            columns.append(column)
+        mac_column, location_column, ip_column, ip_mac_column = columns
+
+        # Everything but the MAC lookup itself is built by the interpreter's C loops, not one entry at a time
+        index = cls()
+        location_table = list(map(MacLocation._make, header['locations']))
+        index._locations = dict(zip(location_table, location_table))
+        locations = list(map(location_table.__getitem__, location_column))
+        index._port_counts = dict(Counter((location.device, location.interface) for location in locations))
+        index.ips = dict(zip(ip_column, ip_mac_column))
+        index._ip_counts = dict(Counter(ip_column))
+        for mac, location in zip(mac_column, locations):
+            index.macs.setdefault(mac, []).append(location)
+
+        # Columns are stored one device after another, so what each device added is a slice of them
+        mac_offset = ip_offset = 0
+        for device, meta in header['devices'].items():
+            index._digests[device] = meta['digest']
+            if meta['hostname']:
+                index.hostnames[device] = meta['hostname']
+            mac_end, ip_end = mac_offset + meta['macs'], ip_offset + meta['ips']
+            index._device_macs[device] = (mac_column[mac_offset:mac_end], locations[mac_offset:mac_end])
+            index._device_ips[device] = (ip_column[ip_offset:ip_end], ip_mac_column[ip_offset:ip_end])
+            mac_offset, ip_offset = mac_end, ip_end
+        return index
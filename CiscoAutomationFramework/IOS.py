@@ -1,57 +1,79 @@
 from CiscoAutomationFramework.FirmwareBase import CiscoFirmware
-from time import sleep
+from CiscoAutomationFramework.Parsers import parse_interfaces
+from CiscoAutomationFramework.ConfigPush import rollback_point_name
+from CiscoAutomationFramework.TransportEngines import standard_confirm_prompts, default_timeout
 
 class IOS(CiscoFirmware):
 
+    interfaces_command = 'show interfaces'
+    # The copy asks where to, the empty line takes the startup-config it offers
+    save_config_commands = (('copy running-config startup-config', default_timeout), ('', 15))
+
+    # What the commands send and how their output is read is shared with the asyncio classes
+
+    @staticmethod
+    def _parse_uptime(show_version, hostname):
+        for line in show_version:
+            if f'{hostname.lower()} uptime' in line.lower():
+                return ' '.join(line.split()[3:])
+        return None
+
+    @staticmethod
+    def _config_saved(data, prompt):
+        return prompt in ''.join(data[-1:]) and not any('%' in line for line in data)
+
+    @staticmethod
+    def _add_local_user_command(username, password, password_code=0, *args, **kwargs):
+        kwarg_string = ' '.join([f'{key} {value}' for key, value in kwargs.items()])
+        return f'username {username} {" ".join(args)} {kwarg_string} secret {password_code} {password}'
+
     @property
     def uptime(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        device_output = self.transport.send_command_get_output('show version')
-        for line in device_output:
-            if f'{self.transport.hostname.lower()} uptime' in line.lower():
-                return ' '.join(line.split()[3:])
-
-        return None
+        return self._parse_uptime(self.send_command_get_output('show version'), self.transport.hostname)
     
     @property
-    def intrfaces(self):
+    def interface_entries(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        raw_data = self.transport.send_command_get_output('show interfaces', buffer_size=500)
-        try:
-            parsed_data = [x.split()[0] for x in raw_data[2:-2] if not x.startswith(' ')]
-        except IndexError as _:
-            raise IndexError('Unexpected data from device, Unable to extract interface names from "show interfaces" command!')
-        return parsed_data
+        raw_data = self.send_command_get_output(self.interfaces_command, buffer_size=500)
+        return parse_interfaces(raw_data[1:-1])
+
+    @property
+    def interfaces(self):
+        return [interface.name for interface in self.interface_entries]
     
     @property
     def mac_address_table(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        return self.transport.send_command_get_output('show mac address-table')
+        return self.send_command_get_output('show mac address-table')
     
     @property
     def arp_table(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
+        return self.send_command_get_output('show ip arp')
 
-        running_config = self.transport.send_command_get_output('show running-config', buffer_size=100)
-        while len(running_config) < 4 and not any([True if self.prompt in x else False for x in reversed(running_config[-4:])]):
-            running_config += self.transport.get_output(buffer_size=100, no_command_sent_previous=True)
-            sleep(0.1)
-        return '\n'.join(running_config[2:-2])
-    
-    @property
-    def startup_config(self):
+    def iter_running_config(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        config = self.transport.send_command_get_output('show startup-config', buffer_size=100)
-        while len(config) < 4 and not any([True if self.prompt in x else False for x in reversed(config[-4:])]):
-            config += self.transport.get_output(buffer_size=100, no_command_sent_previous=True)
-            sleep(0.1)
-        return '\n'.join(config[2:-2])
-    
+        return self._trim_output(self.iter_command_output('show running-config', buffer_size=4096))
+
+    def iter_startup_config(self):
+        self.cli_to_privileged_exec_mode()
+        self.terminal_length('0')
+        return self._trim_output(self.iter_command_output('show startup-config', buffer_size=4096))
+
+    @property
+    def running_config(self):
+        return '\n'.join(self.iter_running_config())
+
+    @property
+    def startup_config(self):
+        return '\n'.join(self.iter_startup_config())
+
     def _terminal_length(self, n='0'):
         self.cli_to_privileged_exec_mode()
         return self.transport.send_command_get_output(f'terminal length {n}')
@@ -61,16 +83,36 @@ class IOS(CiscoFirmware):
         return self.transport.send_command_get_output(f'terminal width {n}')
     
     def save_config(self):
+        self.invalidate_command_cache()
+        self.cli_to_privileged_exec_mode()
+        for command, timeout in self.save_config_commands:
+            data = self.transport.send_command_get_output(command, timeout=timeout)
+        return self._config_saved(data, self.transport.prompt)
+
+    def _answer_confirmations(self, command, timeout=15):
+        data = self.transport.send_command_get_output(command)
+        while data and data[-1].strip().endswith(standard_confirm_prompts):
+            data = self.transport.send_command_get_output('', timeout=timeout)
+        return data
+
+    def _create_rollback_point(self):
+        rollback_point = f'flash:{rollback_point_name()}.cfg'
+        data = self._answer_confirmations(f'copy running-config {rollback_point}')
+        if any('%' in line for line in data):
+            return None
+        return rollback_point
+
+    def _rollback(self, rollback_point):
+        self.cli_to_privileged_exec_mode()
+        data = self.transport.send_command_get_output(f'configure replace {rollback_point} force', timeout=60)
+        return any('rollback done' in line.lower() for line in data)
+
+    def _discard_rollback_point(self, rollback_point):
         self.cli_to_privileged_exec_mode()
-        self.transport.send_command('copy running-config startup-config')
-        data = self.transport.send_command_get_output('', timeout=15)
-        if self.transport.prompt in ''.join(data[-1:]) and not any('%' in line for lint in data):
-            return True
-        return False
+        self._answer_confirmations(f'delete /force {rollback_point}')
 
     def add_local_user(self, username, password, password_code=0, *args, **kwargs):
-        kwarg_string = ' '.join([f'{key} {value}' for key, value in kwargs.items()])
-        command_string = f'username {username} {" ".join(args)} {kwarg_string} secret {password_code} {password}'
+        command_string = self._add_local_user_command(username, password, password_code, *args, **kwargs)
         self.cli_to_config_mode()
         return self.transport.send_command_get_output(command_string)
 
@@ -0,0 +1,125 @@
+from threading import Lock
+import json
+import os
+
+connect_key = '__connect__'
+device_key = '*'
+
+
+def command_key(command):
+    # Arguments rarely change how long a command takes to answer, "show interfaces Gi1/0/1" shares with "show interfaces"
+    # and everything else goes by its first word, "ping 10.0.0.1" with "ping"
+    words = command.split()
+    return ' '.join(words[:2] if words[:1] in (['show'], ['sh']) else words[:1])
+
+
+class LatencyStats:
+
+    def __init__(self, srtt=None, rttvar=0, samples=0, output_bytes=0):
+        self.srtt = srtt
+        self.rttvar = rttvar
+        self.samples = samples
+        self.output_bytes = output_bytes
+
+    def observe(self, seconds, output_bytes=0):
+        # Smoothed estimate and deviation the same way TCP derives its retransmission timeout (RFC 6298)
+        if self.srtt is None:
+            self.srtt = seconds
+            self.rttvar = seconds / 2
+            self.output_bytes = output_bytes
+        else:
+            self.rttvar = .75 * self.rttvar + .25 * abs(self.srtt - seconds)
+            self.srtt = .875 * self.srtt + .125 * seconds
+            self.output_bytes = .875 * self.output_bytes + .125 * output_bytes
+        self.samples += 1
+
+    def back_off(self, waited=0):
+        # The device went quiet for longer than it was given and the output may have been cut short, so the
+        # next wait is at least twice as long as the one that ran out (RFC 6298 doubles its timeout the same way)
+        if self.srtt is not None:
+            self.rttvar = max(self.rttvar * 2, self.srtt, waited / 2)
+
+    @property
+    def timeout(self):
+        return self.srtt + 4 * self.rttvar
+
+    def to_dict(self):
+        return {'srtt': self.srtt, 'rttvar': self.rttvar, 'samples': self.samples, 'output_bytes': self.output_bytes}
+
+
+class LatencyProfiles:
+
+    def __init__(self, path=None, min_samples=3, min_timeout=.2, max_timeout=60, min_connect_timeout=2,
+                 max_buffer=65536):
+        self.path = path
+        self.min_samples = min_samples
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.min_connect_timeout = min_connect_timeout
+        self.max_buffer = max_buffer
+        self.devices = {}
+        self._lock = Lock()
+        if path and os.path.exists(path):
+            with open(path) as file:
+                self.devices = {device: {key: LatencyStats(**stats) for key, stats in commands.items()}
+                                for device, commands in json.load(file).items()}
+
+    def _stats(self, device, key):
+        return self.devices.setdefault(device, {}).setdefault(key, LatencyStats())
+
+    def _learned(self, device, key):
+        stats = self.devices.get(device, {}).get(key)
+        if stats and stats.samples >= self.min_samples:
+            return stats
+        return None
+
+    def record(self, device, command, max_gap, output_bytes, timed_out=False):
+        with self._lock:
+            for key in (command_key(command), device_key):
+                stats = self._stats(device, key)
+                # A read that gave up before the closing prompt only saw the gaps before the stall, so it
+                # never makes the estimate shorter, even when the echo and part of the output came back
+                if timed_out:
+                    stats.back_off(max_gap)
+                else:
+                    stats.observe(max_gap, output_bytes)
+
+    def record_connect(self, device, seconds):
+        with self._lock:
+            self._stats(device, connect_key).observe(seconds)
+
+    def idle_timeout(self, device, command, default):
+        stats = self._learned(device, command_key(command))
+        if stats:
+            return min(max(stats.timeout, self.min_timeout), self.max_timeout)
+        # A command not seen often enough yet may be slower than the rest, so what the device as a whole
+        # has shown can only make the wait longer
+        stats = self._learned(device, device_key)
+        if stats:
+            return min(max(stats.timeout, default), self.max_timeout)
+        return default
+
+    def buffer_size(self, device, command, default):
+        stats = self._learned(device, command_key(command)) or self._learned(device, device_key)
+        if not stats or stats.output_bytes <= default:
+            return default
+        # Big enough to take the usual output in a few reads, without ever shrinking what the caller asked for
+        return min(1 << int(stats.output_bytes - 1).bit_length(), self.max_buffer)
+
+    def connect_timeout(self, device, default):
+        stats = self._learned(device, connect_key)
+        if not stats:
+            return default
+        return min(max(stats.timeout, self.min_connect_timeout), self.max_timeout)
+
+    def to_dict(self):
+        with self._lock:
+            return {device: {key: stats.to_dict() for key, stats in commands.items()}
+                    for device, commands in self.devices.items()}
+
+    def save(self, path=None):
+        path = path or self.path
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(self.to_dict(), file)
+        os.replace(temp_path, path)
@@ -0,0 +1,143 @@
+from bisect import bisect_left
+from threading import Lock
+import json
+import os
+
+default_buckets = (.005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+
+    def __init__(self, buckets=default_buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative_counts(self):
+        total = 0
+        for bucket, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bucket, total
+
+    def to_dict(self):
+        return {'buckets': {('+Inf' if bucket == float('inf') else str(bucket)): count
+                            for bucket, count in self.cumulative_counts()},
+                'count': self.count, 'sum': self.sum}
+
+
+class CommandStats:
+
+    def __init__(self, buckets=default_buckets):
+        self.duration = Histogram(buckets)
+        self.bytes_received = 0
+        self.recv_calls = 0
+        self.timeouts = 0
+
+    def to_dict(self):
+        return {'duration': self.duration.to_dict(), 'bytes_received': self.bytes_received,
+                'recv_calls': self.recv_calls, 'timeouts': self.timeouts}
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return ','.join(f'{key}="{_label_value(value)}"' for key, value in labels.items())
+
+
+def _write_file(path, data):
+    temp_path = f'{path}.tmp'
+    with open(temp_path, 'w') as file:
+        file.write(data)
+    os.replace(temp_path, path)
+
+
+class MetricsRecorder:
+
+    def __init__(self, buckets=default_buckets, prefix='cisco_automation'):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.commands = {}
+        self.phases = {}
+        self._lock = Lock()
+
+    def record_command(self, device, command, seconds, bytes_received=0, recv_calls=0, timeouts=0):
+        with self._lock:
+            stats = self.commands.get((device, command))
+            if stats is None:
+                stats = self.commands[(device, command)] = CommandStats(self.buckets)
+            stats.duration.observe(seconds)
+            stats.bytes_received += bytes_received
+            stats.recv_calls += recv_calls
+            stats.timeouts += timeouts
+
+    def record_phase(self, device, phase, seconds):
+        with self._lock:
+            histogram = self.phases.get((device, phase))
+            if histogram is None:
+                histogram = self.phases[(device, phase)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.commands = {}
+            self.phases = {}
+
+    def to_dict(self):
+        devices = {}
+        with self._lock:
+            for (device, phase), histogram in self.phases.items():
+                devices.setdefault(device, {'phases': {}, 'commands': {}})['phases'][phase] = histogram.to_dict()
+            for (device, command), stats in self.commands.items():
+                devices.setdefault(device, {'phases': {}, 'commands': {}})['commands'][command] = stats.to_dict()
+        return {'devices': devices}
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def write_json(self, path, indent=2):
+        _write_file(path, self.to_json(indent))
+
+    def _histogram_lines(self, name, histogram, **labels):
+        label_string = _labels(**labels)
+        for bucket, count in histogram.cumulative_counts():
+            le = '+Inf' if bucket == float('inf') else bucket
+            yield f'{name}_bucket{{{label_string},le="{le}"}} {count}'
+        yield f'{name}_sum{{{label_string}}} {histogram.sum}'
+        yield f'{name}_count{{{label_string}}} {histogram.count}'
+
+    def to_prometheus(self):
+        prefix = self.prefix
+        with self._lock:
+            phases = list(self.phases.items())
+            commands = list(self.commands.items())
+
+        lines = [f'# HELP {prefix}_phase_duration_seconds Time spent in connection setup phases and fixed delays',
+                 f'# TYPE {prefix}_phase_duration_seconds histogram']
+        for (device, phase), histogram in phases:
+            lines += self._histogram_lines(f'{prefix}_phase_duration_seconds', histogram, device=device, phase=phase)
+
+        lines += [f'# HELP {prefix}_command_duration_seconds Time from sending a command until its output was read',
+                  f'# TYPE {prefix}_command_duration_seconds histogram']
+        for (device, command), stats in commands:
+            lines += self._histogram_lines(f'{prefix}_command_duration_seconds', stats.duration,
+                                           device=device, command=command)
+
+        for name, help_text in (('bytes_received', 'Bytes received for a command'),
+                                ('recv_calls', 'Channel reads made for a command'),
+                                ('timeouts', 'Reads that gave up waiting for the prompt')):
+            lines += [f'# HELP {prefix}_command_{name}_total {help_text}',
+                      f'# TYPE {prefix}_command_{name}_total counter']
+            lines += [f'{prefix}_command_{name}_total{{{_labels(device=device, command=command)}}} '
+                      f'{getattr(stats, name)}' for (device, command), stats in commands]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        _write_file(path, self.to_prometheus())
@@ -0,0 +1,477 @@
+from paramiko import ServerInterface, Transport, RSAKey, AUTH_SUCCESSFUL, AUTH_FAILED, OPEN_SUCCEEDED, \
+    OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+from threading import Thread, Event
+from select import select
+from time import sleep
+import socket
+
+pager_prompt = ' --More-- '
+pager_erase = '\b' * len(pager_prompt) + ' ' * len(pager_prompt) + '\b' * len(pager_prompt)
+
+show_version_banners = {
+    'IOS': [
+        'Cisco IOS Software, C2960X Software (C2960X-UNIVERSALK9-M), Version 15.2(7)E3, RELEASE SOFTWARE (fc3)',
+        'Technical Support: http://www.cisco.com/techsupport',
+        'Copyright (c) 1986-2020 by Cisco Systems, Inc.',
+        'Compiled Wed 23-Dec-20 10:33 by prod_rel_team',
+        '',
+        'ROM: Bootstrap program is C2960X boot loader',
+        'BOOTLDR: C2960X Boot Loader (C2960X-HBOOT-M) Version 15.2(7r)E1, RELEASE SOFTWARE (fc1)',
+        '',
+        '{hostname} uptime is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes',
+    ],
+    'IOSXE': [
+        'Cisco IOS XE Software, Version 17.03.04a',
+        'Cisco IOS Software [Amsterdam], Catalyst L3 Switch Software (CAT9K_IOSXE), Version 17.3.4a, RELEASE SOFTWARE (fc3)',
+        'Technical Support: http://www.cisco.com/techsupport',
+        'Copyright (c) 1986-2021 by Cisco Systems, Inc.',
+        'Compiled Tue 20-Jul-21 05:59 by mcpre',
+        '',
+        'Cisco IOS-XE software, Copyright (c) 2005-2021 by cisco Systems, Inc.',
+        '',
+        '{hostname} uptime is 1 year, 2 weeks, 3 days, 4 hours, 5 minutes',
+    ],
+    'NXOS': [
+        'Cisco Nexus Operating System (NX-OS) Software',
+        'TAC support: http://www.cisco.com/tac',
+        'Copyright (C) 2002-2020, Cisco and/or its affiliates.',
+        'All rights reserved.',
+        'The copyrights to certain works contained in this software are',
+        'owned by other third parties and used and distributed under their own',
+        'licenses, such as open source.',
+        'NX-OS software version 9.3(5)',
+        '',
+        'Kernel uptime is 380 day(s), 4 hour(s), 5 minute(s), 6 second(s)',
+    ],
+}
+
+
+class MockDeviceSettings:
+
+    def __init__(self, firmware='IOS', hostname=None, username=None, password=None, enable_password=None,
+                 start_in_privileged_mode=True, latency=0, command_latency=None, running_config_lines=200,
+                 mac_address_entries=50, arp_entries=50, interface_count=48, show_version_lines=60,
+                 rejected_commands=('bogus',)):
+        if firmware not in show_version_banners:
+            raise ValueError(f'firmware must be one of {", ".join(show_version_banners)}')
+        self.firmware = firmware
+        self.hostname = hostname or f'{firmware.lower()}-mock'
+        self.username = username
+        self.password = password
+        self.enable_password = enable_password
+        self.start_in_privileged_mode = start_in_privileged_mode
+        self.latency = latency
+        self.command_latency = command_latency or {}
+        self.running_config_lines = running_config_lines
+        self.mac_address_entries = mac_address_entries
+        self.arp_entries = arp_entries
+        self.interface_count = interface_count
+        self.show_version_lines = show_version_lines
+        self.rejected_commands = rejected_commands
+
+    def latency_for(self, command):
+        matches = [prefix for prefix in self.command_latency if command.startswith(prefix)]
+        if matches:
+            return self.command_latency[max(matches, key=len)]
+        return self.latency
+
+
+class _MockServerInterface(ServerInterface):
+
+    def __init__(self, settings):
+        self.settings = settings
+        self.shell_requested = Event()
+        self.forwards = {}
+
+    def get_allowed_auths(self, username):
+        return 'password'
+
+    def check_auth_password(self, username, password):
+        if self.settings.username is not None and username != self.settings.username:
+            return AUTH_FAILED
+        if self.settings.password is not None and password != self.settings.password:
+            return AUTH_FAILED
+        return AUTH_SUCCESSFUL
+
+    def check_channel_request(self, kind, chanid):
+        if kind == 'session':
+            return OPEN_SUCCEEDED
+        return OPEN_FAILED_ADMINISTRATIVELY_PROHIBITED
+
+    def check_channel_direct_tcpip_request(self, chanid, origin, destination):
+        # Lets the mock stand in for a bastion host that tunnels to other (mock) devices
+        self.forwards[chanid] = destination
+        return OPEN_SUCCEEDED
+
+    def check_channel_pty_request(self, channel, term, width, height, pixelwidth, pixelheight, modes):
+        return True
+
+    def check_channel_shell_request(self, channel):
+        return True
+
+
+class MockShell:
+
+    def __init__(self, settings, channel):
+        self.settings = settings
+        self.channel = channel
+        self.hostname = settings.hostname
+        self.mode = '#' if settings.start_in_privileged_mode else '>'
+        self.terminal_length = 24
+        self.applied_config = []
+        self.rollback_points = {}
+        self._pending = ''
+
+    @property
+    def prompt(self):
+        return f'{self.hostname}{self.mode}'
+
+    def _send(self, data):
+        self.channel.sendall(data.encode())
+
+    def _read_char(self):
+        while not self._pending:
+            data = self.channel.recv(4096)
+            if not data:
+                raise EOFError
+            self._pending += data.decode(errors='replace')
+        char, self._pending = self._pending[0], self._pending[1:]
+        return char
+
+    def _read_line(self, echo=True):
+        line = ''
+        while True:
+            char = self._read_char()
+            if char in '\r\n':
+                if char == '\r' and self._pending.startswith('\n'):
+                    self._pending = self._pending[1:]
+                break
+            line += char
+        if echo:
+            self._send(f'{line}\r\n')
+        else:
+            self._send('\r\n')
+        return line
+
+    def _send_output(self, lines):
+        page_size = self.terminal_length - 1 if self.terminal_length else 0
+        if not page_size or len(lines) <= page_size:
+            if lines:
+                self._send('\r\n'.join(lines) + '\r\n')
+            return
+        position = 0
+        while position < len(lines):
+            self._send('\r\n'.join(lines[position:position + page_size]) + '\r\n')
+            position += page_size
+            if position >= len(lines):
+                return
+            self._send(pager_prompt)
+            answer = self._read_char()
+            self._send(pager_erase)
+            if answer in 'qQ':
+                return
+            if answer in '\r\n':
+                page_size = 1
+
+    def run(self):
+        try:
+            self._send(f'\r\n{self.prompt}')
+            while True:
+                command = self._read_line()
+                if not self.handle_command(command.strip()):
+                    break
+                self._send(self.prompt)
+        except (EOFError, OSError):
+            pass
+        # The client may already have torn down the whole transport, not just this shell
+        try:
+            self.channel.close()
+        except (EOFError, OSError):
+            pass
+
+    def handle_command(self, command):
+        words = command.split()
+        if not words:
+            return True
+        latency = self.settings.latency_for(command)
+        if latency:
+            sleep(latency)
+
+        if words[0] == 'exit':
+            if self.mode == '(config-if)#':
+                self.mode = '(config)#'
+                return True
+            if self.mode == '(config)#':
+                self.mode = '#'
+                return True
+            return False
+        if words[0] == 'end' and self.mode.startswith('('):
+            self.mode = '#'
+            return True
+        if self.mode.startswith('('):
+            return self.handle_config_command(command, words)
+        if words[0] == 'enable':
+            return self.handle_enable()
+        if words[0] == 'disable':
+            self.mode = '>'
+            return True
+        if words[0].startswith('term') and len(words) == 3 and words[2].isdigit():
+            if words[1].startswith('len'):
+                self.terminal_length = int(words[2])
+            return True
+        if self.mode == '#' and self.handle_rollback_command(command, words):
+            return True
+        if words[0].startswith('conf') and self.mode == '#':
+            self._send('Enter configuration commands, one per line.  End with CNTL/Z.\r\n')
+            self.mode = '(config)#'
+            return True
+        if words[0] == 'copy' and command.endswith('running-config startup-config') and self.mode == '#':
+            return self.handle_copy()
+        if words[0] in ('show', 'sh'):
+            output = self.show(' '.join(words[1:]))
+            if output is not None:
+                self._send_output(output)
+                return True
+        self.send_invalid(command)
+        return True
+
+    def handle_enable(self):
+        if self.mode == '#':
+            return True
+        if self.settings.enable_password:
+            self._send('Password: ')
+            if self._read_line(echo=False) != self.settings.enable_password:
+                self._send('% Access denied\r\n\r\n')
+                return True
+        self.mode = '#'
+        return True
+
+    def handle_copy(self):
+        if self.settings.firmware == 'NXOS':
+            self._send('[########################################] 100%\r\nCopy complete.\r\n')
+            return True
+        self._send('Destination filename [startup-config]? ')
+        self._read_line()
+        self._send('Building configuration...\r\n[OK]\r\n')
+        return True
+
+    def handle_rollback_command(self, command, words):
+        nexus = self.settings.firmware == 'NXOS'
+        if nexus and words[0] == 'checkpoint' and len(words) == 2:
+            self.rollback_points[words[1]] = list(self.applied_config)
+            self._send('.......Done\r\n')
+        elif nexus and words[:3] == ['rollback', 'running-config', 'checkpoint'] and len(words) == 4:
+            if words[3] not in self.rollback_points:
+                self._send(f'% Checkpoint {words[3]} does not exist\r\n')
+                return True
+            self.applied_config = list(self.rollback_points[words[3]])
+            self._send('Collecting Running-Config\r\nGenerating Rollback Patch\r\nExecuting Rollback Patch\r\n'
+                       'Rollback completed successfully.\r\n')
+        elif nexus and words[:2] == ['no', 'checkpoint'] and len(words) == 3:
+            self.rollback_points.pop(words[2], None)
+        elif not nexus and words[:2] == ['copy', 'running-config'] and len(words) == 3 and \
+                words[2].startswith('flash:'):
+            self._send(f'Destination filename [{words[2][6:]}]? ')
+            self._read_line()
+            self.rollback_points[words[2]] = list(self.applied_config)
+            self._send('4096 bytes copied in 0.100 secs\r\n')
+        elif not nexus and words[:2] == ['configure', 'replace'] and len(words) >= 3:
+            if words[2] not in self.rollback_points:
+                self._send(f'%Error opening {words[2]} (No such file or directory)\r\n')
+                return True
+            self.applied_config = list(self.rollback_points[words[2]])
+            self._send('Total number of passes: 1\r\nRollback Done\r\n\r\n')
+        elif not nexus and words[:2] == ['delete', '/force'] and len(words) == 3:
+            self.rollback_points.pop(words[2], None)
+        else:
+            return False
+        return True
+
+    def handle_config_command(self, command, words):
+        if command.startswith(self.settings.rejected_commands):
+            self.send_invalid(command)
+            return True
+        self.applied_config.append(command)
+        if words[0] == 'interface':
+            self.mode = '(config-if)#'
+        elif words[0] == 'hostname' and len(words) == 2:
+            self.hostname = words[1]
+        return True
+
+    def send_invalid(self, command):
+        if self.settings.firmware == 'NXOS':
+            self._send(f'{" " * len(self.prompt)}^\r\n% Invalid command at \'^\' marker.\r\n\r\n')
+        else:
+            self._send(f'{" " * len(self.prompt)}^\r\n% Invalid input detected at \'^\' marker.\r\n\r\n')
+
+    def show(self, arguments):
+        settings = self.settings
+        nexus = settings.firmware == 'NXOS'
+        if arguments.startswith('ver'):
+            lines = [line.format(hostname=self.hostname) for line in show_version_banners[settings.firmware]]
+            return lines + [f'  version detail line {x}' for x in range(settings.show_version_lines - len(lines))]
+        if arguments.startswith('clock'):
+            return ['*12:00:00.000 UTC Mon Oct 18 2026']
+        if arguments.startswith(('run', 'start')):
+            return self.configuration()
+        if arguments.startswith('mac'):
+            return self.mac_address_table(nexus)
+        if arguments.startswith('ip arp'):
+            return self.arp_table(nexus)
+        if arguments.startswith('int'):
+            return self.interfaces(nexus)
+        return None
+
+    def _interface_name(self, index, nexus):
+        return f'Ethernet1/{index + 1}' if nexus else f'GigabitEthernet1/0/{index + 1}'
+
+    def configuration(self):
+        lines = ['Building configuration...', '', 'Current configuration : 4096 bytes', '!', 'version 15.2',
+                 f'hostname {self.hostname}', '!']
+        index = 0
+        while len(lines) < self.settings.running_config_lines - 1:
+            lines += [f'interface {self._interface_name(index, False)}', f' description mock port {index}',
+                      ' switchport mode access', '!']
+            index += 1
+        return lines[:self.settings.running_config_lines - 1] + self.applied_config + ['end', '']
+
+    def mac_address_table(self, nexus):
+        entries = self.settings.mac_address_entries
+        if nexus:
+            lines = ['Legend:', '        * - primary entry, G - Gateway MAC, (R) - Routed MAC, O - Overlay MAC',
+                     '   VLAN     MAC Address      Type      age     Secure NTFY Ports',
+                     '---------+-----------------+--------+---------+------+----+------------------']
+            for x in range(entries):
+                mac = f'{x:012x}'
+                lines.append(f'*  {10 + x % 20:<4}    {mac[:4]}.{mac[4:8]}.{mac[8:]}   dynamic  0         F      F    '
+                             f'Eth1/{x % self.settings.interface_count + 1}')
+            return lines
+        lines = ['          Mac Address Table', '-------------------------------------------', '',
+                 'Vlan    Mac Address       Type        Ports', '----    -----------       --------    -----']
+        for x in range(entries):
+            mac = f'{x:012x}'
+            lines.append(f'{10 + x % 20:>4}    {mac[:4]}.{mac[4:8]}.{mac[8:]}    DYNAMIC     '
+                         f'Gi1/0/{x % self.settings.interface_count + 1}')
+        lines.append(f'Total Mac Addresses for this criterion: {entries}')
+        return lines
+
+    def arp_table(self, nexus):
+        entries = self.settings.arp_entries
+        if nexus:
+            lines = ['', 'IP ARP Table for context default', f'Total number of entries: {entries}',
+                     'Address         Age       MAC Address     Interface       Flags']
+            for x in range(entries):
+                mac = f'{x:012x}'
+                lines.append(f'10.{x >> 16 & 255}.{x >> 8 & 255}.{x & 255:<9} 00:01:23  {mac[:4]}.{mac[4:8]}.{mac[8:]}  '
+                             f'Vlan{10 + x % 20}')
+            return lines
+        lines = ['Protocol  Address          Age (min)  Hardware Addr   Type   Interface']
+        for x in range(entries):
+            mac = f'{x:012x}'
+            lines.append(f'Internet  10.{x >> 16 & 255}.{x >> 8 & 255}.{x & 255:<12} 5   {mac[:4]}.{mac[4:8]}.{mac[8:]}  '
+                         f'ARPA   Vlan{10 + x % 20}')
+        return lines
+
+    def interfaces(self, nexus):
+        lines = []
+        for x in range(self.settings.interface_count):
+            if nexus:
+                lines += [f'{self._interface_name(x, True)} is up', 'admin state is up, Dedicated Interface',
+                          '  Hardware: 1000/10000 Ethernet, address: 0011.2233.4455 (bia 0011.2233.4455)', '']
+            else:
+                lines += [f'{self._interface_name(x, False)} is up, line protocol is up (connected)',
+                          '  Hardware is Gigabit Ethernet, address is 0011.2233.4455 (bia 0011.2233.4455)',
+                          '  MTU 1500 bytes, BW 1000000 Kbit/sec, DLY 10 usec,']
+        return lines
+
+
+def _forward(channel, destination):
+    try:
+        sock = socket.create_connection(destination, timeout=10)
+    except OSError:
+        channel.close()
+        return
+    try:
+        while True:
+            readable, _, _ = select([channel, sock], [], [], 1)
+            if channel in readable:
+                data = channel.recv(32768)
+                if not data:
+                    break
+                sock.sendall(data)
+            if sock in readable:
+                data = sock.recv(32768)
+                if not data:
+                    break
+                channel.sendall(data)
+            if channel.closed:
+                break
+    except OSError:
+        pass
+    finally:
+        sock.close()
+        channel.close()
+
+
+class MockCiscoServer:
+
+    def __init__(self, settings=None, host='127.0.0.1', port=0, **kwargs):
+        self.settings = settings or MockDeviceSettings(**kwargs)
+        self.host = host
+        self.port = port
+        self.host_key = RSAKey.generate(2048)
+        self.connections = 0
+        self._socket = None
+        self._transports = []
+        self._stopped = Event()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((self.host, self.port))
+        self._socket.listen(1024)
+        self.port = self._socket.getsockname()[1]
+        Thread(target=self._accept_connections, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._socket:
+            self._socket.close()
+        for transport in self._transports:
+            transport.close()
+
+    def _accept_connections(self):
+        while not self._stopped.is_set():
+            try:
+                client, _ = self._socket.accept()
+            except OSError:
+                return
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connections += 1
+            Thread(target=self._serve_connection, args=(client,), daemon=True).start()
+
+    def _serve_connection(self, client):
+        transport = Transport(client)
+        self._transports.append(transport)
+        transport.add_server_key(self.host_key)
+        interface = _MockServerInterface(self.settings)
+        try:
+            transport.start_server(server=interface)
+        except Exception:
+            return
+        while transport.is_active() and not self._stopped.is_set():
+            channel = transport.accept(timeout=1)
+            if channel is None:
+                continue
+            if channel.get_id() in interface.forwards:
+                Thread(target=_forward, args=(channel, interface.forwards.pop(channel.get_id())), daemon=True).start()
+                continue
+            Thread(target=MockShell(self.settings, channel).run, daemon=True).start()
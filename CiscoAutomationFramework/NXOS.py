@@ -1,8 +1,37 @@
 from CiscoAutomationFramework.FirmwareBase import CiscoFirmware
-from time import sleep
+from CiscoAutomationFramework.Parsers import parse_interfaces
+from CiscoAutomationFramework.ConfigPush import rollback_point_name
 
 class NXOS(CiscoFirmware):
 
+    parser_firmware = 'NXOS'
+    interfaces_command = 'show interface'
+    save_config_commands = (('copy running-config startup-config', 15),)
+
+    # What the commands send and how their output is read is shared with the asyncio classes
+
+    @staticmethod
+    def _parse_uptime(show_version, hostname):
+        for line in show_version:
+            if 'uptime' in line.lower():
+                return ' '.join(line.split()[3:])
+        return None
+
+    @staticmethod
+    def _config_saved(data, prompt):
+        return prompt in ''.join(data[-1:]) and any('complete' in line for line in data)
+
+    @staticmethod
+    def _add_local_user_command(username, password, password_code=0, *args, **kwargs):
+        if len(password) < 8:
+            raise Exception('Password must be at least 8 characters!')
+        kwarg_string = ' '.join([f'{key} {value}' for key, value in kwargs.items()])
+
+        if ' ' in password:
+            password = f'"{password}"'
+
+        return f'username {username} {" ".join(args)} {kwarg_string} password {password_code} {password}'
+
     @property
     def is_nexus(self):
         return True
@@ -11,84 +40,83 @@ class NXOS(CiscoFirmware):
     def uptime(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        device_output = self.transport.send_command_get_output('show version')
-        for line in device_output.splitlines():
-            if 'uptime' in line.lower():
-                return ' '.join(line.split()[3:])
-            
-        return None
+        return self._parse_uptime(self.send_command_get_output('show version'), self.transport.hostname)
         
     @property
-    def interfaces(self):
-        possible_interface_prefixes = ('Eth', 'Po', 'Vl', 'mgm ', 'Gi', 'Te', 'Fo', 'Fa')
+    def interface_entries(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        raw_data = self.transport.send_command_get_output('show interface', buffer_size=500)
-        try:
-            parsed_data = [x.split()[0] for x in raw_data[2:-2] if len(x > 1 and x.startswith(possible_interface_prefixes))]
-        except IndexError as _:
-            raise IndexError('Unexpected data from device, Unable to extract interface names from "show interfaces" command!')
-        return parsed_data        
+        raw_data = self.send_command_get_output(self.interfaces_command, buffer_size=500)
+        return parse_interfaces(raw_data[1:-1])
+
+    @property
+    def interfaces(self):
+        return [interface.name for interface in self.interface_entries]
 
     @property
     def mac_address_table(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        return self.transport.send_command_get_output('show mac address-table')
+        return self.send_command_get_output('show mac address-table')
 
     @property
     def arp_table(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        return self.transport.send_command_get_output('show ip arp')
+        return self.send_command_get_output('show ip arp')
     
-    @property
-    def running_config(self):
+    def iter_running_config(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
-        self.transport.send_command('show running-config')
+        return self._trim_output(self.iter_command_output('show running-config', buffer_size=4096))
 
-        running_config = self.transport.get_output(buffer_size=100)
-        while len(running_config) < 4 and not any ([True if self.prompt in x else False for x in reversed(running_config[-4:])]):
-            running_config += self.transport.get_output(buffer_size=100, no_command_sent_previous=True)
-            sleep(0.1)
-        return '\n'.join(running_config[2:-2])
-    
-    @property
-    def startup_config(self):
+    def iter_startup_config(self):
         self.cli_to_privileged_exec_mode()
         self.terminal_length('0')
+        return self._trim_output(self.iter_command_output('show startup-config', buffer_size=4096))
+
+    @property
+    def running_config(self):
+        return '\n'.join(self.iter_running_config())
+
+    @property
+    def startup_config(self):
+        return '\n'.join(self.iter_startup_config())
 
-        Config = self.transport.send_command_get_output('show startup_config', buffer_size=100)
-        while len(config) < 4 and not any([True if self.prompt in x else False for x in reversed(config[-4:])]):
-            Config += self.transport.get_output(buffer_size=100, no_command_sent_previous=True)
-            sleep(0.1)
-        return '\n'.join(Config[2:-2])
-     
     def _terminal_length(self, n='0'):
-        self.cli_to_config_mode()
+        self.cli_to_privileged_exec_mode()
         return self.transport.send_command_get_output(f'terminal length {n}')
     
     def _terminal_width(self, n='0'):
-        self.cli_to_config_mode()
+        self.cli_to_privileged_exec_mode()
         return self.transport.send_command_get_output(f'terminal width {n}')
     
     def save_config(self):
+        self.invalidate_command_cache()
         self.cli_to_privileged_exec_mode()
-        data = self.transport.send_command_get_output('copy running-config startup-config', timeout=15)
-        if self.transport.prompt in ''.join(data[-1:]) and any ('complete' in line for line in data):
-            return True
-        return False
-    
-    def add_local_user(self, username, password, password_code=0, *args, **kwargs):
-        if len(password) < 8:
-            raise Exception('Password must be at least 8 characters!')
-        kwarg_string = ' '.join([f'{key} {value}' for key, value in kwargs.items()])
+        for command, timeout in self.save_config_commands:
+            data = self.transport.send_command_get_output(command, timeout=timeout)
+        return self._config_saved(data, self.transport.prompt)
 
-        if ' ' in password:
-            password = f'"{password}"'
+    def _create_rollback_point(self):
+        rollback_point = rollback_point_name()
+        data = self.transport.send_command_get_output(f'checkpoint {rollback_point}', timeout=60)
+        if any('%' in line or 'error' in line.lower() for line in data):
+            return None
+        return rollback_point
+
+    def _rollback(self, rollback_point):
+        self.cli_to_privileged_exec_mode()
+        data = self.transport.send_command_get_output(f'rollback running-config checkpoint {rollback_point}',
+                                                      timeout=120)
+        return any('completed successfully' in line.lower() for line in data)
 
-        command_string = f'username {username} {" ".join(args)} {kwarg_string} password {password_code} {password}'
+    def _discard_rollback_point(self, rollback_point):
+        self.cli_to_privileged_exec_mode()
+        self.transport.send_command_get_output(f'no checkpoint {rollback_point}')
+    
+    def add_local_user(self, username, password, password_code=0, *args, **kwargs):
+        command_string = self._add_local_user_command(username, password, password_code, *args, **kwargs)
         self.cli_to_config_mode()
         return self.transport.send_command_get_output(command_string)
 
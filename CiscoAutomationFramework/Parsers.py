@@ -0,0 +1,111 @@
+from CiscoAutomationFramework.Exceptions import ParserError
+from typing import NamedTuple
+import re
+
+mac_pattern = r'[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}\.[0-9a-fA-F]{4}'
+
+
+class MacAddressEntry(NamedTuple):
+    vlan: str
+    mac_address: str
+    type: str
+    interface: str
+
+
+class ArpEntry(NamedTuple):
+    ip_address: str
+    age: str
+    mac_address: str
+    interface: str
+
+
+class InterfaceEntry(NamedTuple):
+    name: str
+    status: str
+    protocol: str
+
+
+class TableSpec(NamedTuple):
+    # entry groups map positionally onto the record fields, lines matching skip are headers, legends and totals
+    entry: re.Pattern
+    skip: re.Pattern
+    record: type
+
+
+mac_address_table_specs = {
+    'IOS': TableSpec(
+        # Platforms with a legend mark entries with a * or + in front of the vlan
+        entry=re.compile(rf'^\s*[*+]?\s*(\S+)\s+({mac_pattern})\s+(\S+)\s+(?:\S+\s+)*?(\S+)\s*$'),
+        skip=re.compile(r'^\s*$|^\s*-[-+\s]*$|^\s*Mac Address Table|^\s*Vlan\s+Mac Address|^\s*Total Mac Address'
+                        r'|^Legend:|^\s+\S.*\s-\s|^\s*(?:Unicast|Multicast) Entries|^\s*Displaying entries', re.I),
+        record=MacAddressEntry,
+    ),
+    'NXOS': TableSpec(
+        entry=re.compile(rf'^[*+GORCV]?\s*(\S+)\s+({mac_pattern})\s+(\S+)\s+\S+\s+\S+\s+\S+\s+(\S.*?)\s*$'),
+        skip=re.compile(r'^\s*$|^\s*-[-+\s]*$|^Legend:|^\s+\S.*\s-\s|^\s*VLAN\s+MAC Address', re.I),
+        record=MacAddressEntry,
+    ),
+}
+
+arp_table_specs = {
+    'IOS': TableSpec(
+        entry=re.compile(rf'^Internet\s+(\S+)\s+(\S+)\s+({mac_pattern})\s+\S+\s+(\S+)\s*$'),
+        skip=re.compile(r'^\s*$|^Protocol\s+Address|^Internet\s+\S+\s+\S+\s+Incomplete\s', re.I),
+        record=ArpEntry,
+    ),
+    'NXOS': TableSpec(
+        entry=re.compile(rf'^(\d+\.\d+\.\d+\.\d+)\s+(\S+)\s+({mac_pattern})\s+(\S+)'),
+        skip=re.compile(r'^\s*$|^Flags:|^\s+\S+ - |^IP ARP Table|^Total number of entries|^Address\s+Age'
+                        r'|^\d+\.\d+\.\d+\.\d+\s+\S+\s+INCOMPLETE\s', re.I),
+        record=ArpEntry,
+    ),
+}
+
+interface_header_pattern = re.compile(
+    r'^(\S+) is ((?:administratively )?\S+?)(?: \([^)]*\))?(?:, line protocol is (\S+?))?(?: \(.*\))?(?:,.*)?\s*$'
+)
+
+# NX-OS prints a few interface details unindented right under the header line
+interface_detail_pattern = re.compile(r'^(admin state is|Dedicated Interface|Belongs to|Hardware:|EtherType is)')
+
+
+def parse_table(lines, spec):
+    entry_match = spec.entry.match
+    skip_match = spec.skip.match
+    make_record = spec.record._make
+    parsed = []
+    append = parsed.append
+    for line_number, line in enumerate(lines, 1):
+        match = entry_match(line)
+        if match:
+            append(make_record(match.groups()))
+        elif not skip_match(line):
+            raise ParserError(f'Unable to parse line {line_number} as {spec.record.__name__}: {line!r}')
+    return parsed
+
+
+def _spec_for(specs, firmware):
+    try:
+        return specs[firmware]
+    except KeyError:
+        raise ParserError(f'No parser available for {firmware}, expected one of {", ".join(specs)}')
+
+
+def parse_mac_address_table(lines, firmware='IOS'):
+    return parse_table(lines, _spec_for(mac_address_table_specs, firmware))
+
+
+def parse_arp_table(lines, firmware='IOS'):
+    return parse_table(lines, _spec_for(arp_table_specs, firmware))
+
+
+def parse_interfaces(lines):
+    parsed = []
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip() or line[0].isspace() or interface_detail_pattern.match(line):
+            continue
+        match = interface_header_pattern.match(line)
+        if not match:
+            raise ParserError(f'Unable to parse line {line_number} as {InterfaceEntry.__name__}: {line!r}')
+        parsed.append(InterfaceEntry(match.group(1), match.group(2), match.group(3) or match.group(2)))
+    return parsed
@@ -0,0 +1,64 @@
+from CiscoAutomationFramework.ThreadLib import SSH, start_pool
+from CiscoAutomationFramework.util import chunker
+from multiprocessing import get_context
+from queue import Empty
+from math import ceil
+from os import cpu_count
+
+default_result_attributes = ('ip', 'hostname', 'is_nexus', 'commands_sent')
+
+
+def _job_result(job, attributes):
+    result = {attribute: getattr(job, attribute, None) for attribute in attributes}
+    result['exception'] = repr(job.exception) if job.exception else None
+    return result
+
+
+def _worker(results, object, ips, username, password, enable_password, perform_secondary_action, max_workers,
+            attributes, kwargs):
+    try:
+        for job in start_pool(object, ips, username, password, enable_password=enable_password,
+                              perform_secondary_action=perform_secondary_action, max_workers=max_workers, **kwargs):
+            results.put(_job_result(job, attributes))
+    finally:
+        results.put(None)
+
+
+def start_processes(object, ips, username, password, enable_password=None, perform_secondary_action=False,
+                    processes=None, threads_per_process=25, attributes=(), **kwargs):
+
+    if not issubclass(object, SSH):
+        raise TypeError('object MUST be a subclass of ThreadedSSH!')
+
+    ips = list(ips)
+    if not ips:
+        return
+    processes = min(processes or cpu_count(), len(ips))
+    attributes = tuple(default_result_attributes) + tuple(x for x in attributes if x not in default_result_attributes)
+
+    context = get_context()
+    results = context.Queue()
+    workers = [context.Process(target=_worker, daemon=True,
+                               args=(results, object, shard, username, password, enable_password,
+                                     perform_secondary_action, threads_per_process, attributes, kwargs))
+               for shard in chunker(ips, ceil(len(ips) / processes))]
+    for worker in workers:
+        worker.start()
+
+    running = len(workers)
+    try:
+        while running:
+            try:
+                result = results.get(timeout=1)
+            except Empty:
+                # A worker that died without reporting back (killed, out of memory) would otherwise hang the parent
+                if not any(worker.is_alive() for worker in workers):
+                    break
+                continue
+            if result is None:
+                running -= 1
+            else:
+                yield result
+    finally:
+        for worker in workers:
+            worker.join(timeout=1)
@@ -0,0 +1,85 @@
+from selectors import DefaultSelector, EVENT_WRITE
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from itertools import repeat
+from time import monotonic
+import socket
+import errno
+import os
+
+in_progress_errors = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY)
+resolver_threads = 16
+
+
+def _resolve(host, port, flags=0):
+    try:
+        family, _, _, _, address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=flags)[0]
+    except OSError as e:
+        return e
+    return family, address
+
+
+def _open(family, address):
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    return sock, sock.connect_ex(address)
+
+
+def probe(hosts, port=22, timeout=1.0, max_concurrent=512) -> dict:
+    # One thread and a selector over non blocking connects, thousands of hosts cost file descriptors, not threads
+    results = {}
+    hosts = list(dict.fromkeys(hosts))
+    # Literal addresses are parsed on the spot and names are looked up side by side before anything is timed,
+    # a slow resolver never holds up the selector loop
+    addresses = {host: _resolve(host, port, socket.AI_NUMERICHOST) for host in hosts}
+    names = [host for host, address in addresses.items() if isinstance(address, OSError)]
+    if names:
+        with ThreadPoolExecutor(max_workers=min(resolver_threads, len(names))) as executor:
+            addresses.update(zip(names, executor.map(_resolve, names, repeat(port))))
+    for host, address in addresses.items():
+        if isinstance(address, OSError):
+            results[host] = str(address)
+    pending = deque(host for host in hosts if host not in results)
+    in_flight = {}
+    selector = DefaultSelector()
+    try:
+        while pending or in_flight:
+            while pending and len(in_flight) < max_concurrent:
+                host = pending.popleft()
+                try:
+                    sock, error = _open(*addresses[host])
+                except OSError as e:
+                    results[host] = str(e)
+                    continue
+                if error in in_progress_errors:
+                    in_flight[sock] = (host, monotonic() + timeout)
+                    selector.register(sock, EVENT_WRITE)
+                    continue
+                results[host] = os.strerror(error) if error else None
+                sock.close()
+
+            if not in_flight:
+                continue
+            # Sockets are opened in order with the same timeout, so the first one in flight expires first
+            _, first_deadline = next(iter(in_flight.values()))
+            for key, _ in selector.select(max(first_deadline - monotonic(), 0)):
+                sock = key.fileobj
+                host, _ = in_flight.pop(sock)
+                error = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                results[host] = os.strerror(error) if error else None
+                selector.unregister(sock)
+                sock.close()
+
+            now = monotonic()
+            for sock, (host, deadline) in list(in_flight.items()):
+                if deadline > now:
+                    break
+                del in_flight[sock]
+                results[host] = f'no answer on port {port} within {timeout}s'
+                selector.unregister(sock)
+                sock.close()
+    finally:
+        for sock in in_flight:
+            sock.close()
+        selector.close()
+    return results
@@ -0,0 +1,116 @@
+from CiscoAutomationFramework import connect_ssh
+from contextlib import contextmanager
+from collections.abc import Hashable
+from hashlib import sha256
+from threading import Lock
+from time import monotonic
+
+
+class SessionPool:
+
+    def __init__(self, idle_timeout=300, keepalive_interval=30, health_check_after=60, **connect_kwargs):
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.health_check_after = health_check_after
+        self.connect_kwargs = connect_kwargs
+        self._idle_sessions = {}
+        self._checked_out = {}
+        self._lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_all()
+
+    def _is_healthy(self, session, idle_for):
+        if not session.transport.is_connected:
+            return False
+        if idle_for < self.health_check_after:
+            return True
+        try:
+            output = session.transport.send_command_get_output('')
+        except Exception:
+            return False
+        return bool(output) and session.transport.prompt in output[-1]
+
+    def _close(self, session):
+        try:
+            session.close_connection()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _key(host, port, username, password, enable_password, connect_kwargs):
+        # A session is only handed out again for the same login made the same way, the passwords are compared
+        # by digest so the pool does not keep another copy of them around
+        credentials = sha256(f'{password}\0{enable_password}'.encode()).hexdigest()
+        options = tuple(sorted((name, value if isinstance(value, Hashable) else id(value))
+                               for name, value in connect_kwargs.items()))
+        return host, port, username, credentials, options
+
+    def acquire(self, host, username, password, port=22, enable_password=None, **connect_kwargs):
+        # What is given here overrides what the pool was created with
+        connect_kwargs = {**self.connect_kwargs, **connect_kwargs}
+        key = self._key(host, port, username, password, enable_password, connect_kwargs)
+        self.evict_idle()
+        while True:
+            with self._lock:
+                idle = self._idle_sessions.get(key)
+                if not idle:
+                    break
+                session, last_used = idle.pop()
+            if self._is_healthy(session, monotonic() - last_used):
+                with self._lock:
+                    self._checked_out[id(session)] = key
+                return session
+            self._close(session)
+
+        session = connect_ssh(host, username, password, port=port, enable_password=enable_password, **connect_kwargs)
+        if self.keepalive_interval:
+            session.transport.set_keepalive(self.keepalive_interval)
+        with self._lock:
+            self._checked_out[id(session)] = key
+        return session
+
+    def release(self, session, discard=False):
+        with self._lock:
+            key = self._checked_out.pop(id(session), None)
+            keep = key and not discard
+            if keep:
+                self._idle_sessions.setdefault(key, []).append((session, monotonic()))
+        if not keep:
+            self._close(session)
+        # Sessions idle for too long are closed whenever one goes back, not only when another is taken out
+        self.evict_idle()
+
+    @contextmanager
+    def session(self, host, username, password, port=22, enable_password=None, **connect_kwargs):
+        session = self.acquire(host, username, password, port, enable_password, **connect_kwargs)
+        try:
+            yield session
+        except Exception:
+            # The CLI may have been left mid command, so the session is not handed out again
+            self.release(session, discard=True)
+            raise
+        self.release(session)
+
+    def evict_idle(self):
+        expired = []
+        now = monotonic()
+        with self._lock:
+            for key, idle in list(self._idle_sessions.items()):
+                expired += [session for session, last_used in idle if now - last_used > self.idle_timeout]
+                idle[:] = [(session, last_used) for session, last_used in idle if now - last_used <= self.idle_timeout]
+                if not idle:
+                    del self._idle_sessions[key]
+        for session in expired:
+            self._close(session)
+        return len(expired)
+
+    def close_all(self):
+        with self._lock:
+            sessions = [session for idle in self._idle_sessions.values() for session, _ in idle]
+            self._idle_sessions = {}
+        for session in sessions:
+            self._close(session)
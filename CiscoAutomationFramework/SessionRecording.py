@@ -0,0 +1,170 @@
+from CiscoAutomationFramework.TransportEngines import BaseEngine, default_command_end, masked_secret
+from CiscoAutomationFramework.Exceptions import ReplayError
+from collections import deque
+from time import monotonic, sleep, time
+import gzip
+import json
+import re
+
+recording_version = 1
+sent, received = 's', 'r'
+# What follows one of these keywords on a configuration line is a credential, after an optional encryption type
+secret_argument_pattern = re.compile(r'(\b(?:secret|password|key-string|key|community)[ \t]+(?:\d[ \t]+)?)("[^"\r\n]*"|[^\s"]+)')
+
+
+def redact_secrets(text):
+    return secret_argument_pattern.sub(rf'\1{masked_secret}', text)
+
+
+class RecordingEngine(BaseEngine):
+
+    def __init__(self, engine, path):
+        super().__init__()
+        self.engine = engine
+        self.path = path
+        self._file = None
+        self._start = None
+
+    def _write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+    def _event(self, kind, data):
+        self._write([round(monotonic() - self._start, 6), kind, data])
+
+    @property
+    def timeout(self):
+        return self.engine.timeout
+
+    @timeout.setter
+    def timeout(self, value):
+        self.engine.timeout = value
+
+    @property
+    def is_connected(self):
+        return self.engine.is_connected
+
+    def set_keepalive(self, interval):
+        self.engine.set_keepalive(interval)
+
+    def connect_to_server(self, ip, username, password, port, **kwargs):
+        self.metrics_device = ip
+        self.engine.connect_to_server(ip, username, password, port, **kwargs)
+        self.prompt, self.hostname = self.engine.prompt, self.engine.hostname
+        self._start = monotonic()
+        self._file = gzip.open(self.path, 'wt', encoding='utf-8')
+        self._write({'version': recording_version, 'ip': ip, 'port': port, 'hostname': self.hostname,
+                     'prompt': self.prompt, 'recorded_at': time(), 'event_driven_reads': self.event_driven_reads,
+                     'deterministic_completion': self.deterministic_completion})
+
+    def _wait_for_output(self, timeout):
+        return self.engine._wait_for_output(timeout)
+
+    def _get_output(self, buffer_size):
+        data = self.engine._get_output(buffer_size)
+        if data:
+            self._recv_calls += 1
+            self._bytes_received += len(data)
+            # The device echoes configuration lines back and shows credentials in its config, neither is kept
+            self._event(received, redact_secrets(data))
+        return data
+
+    def _send_command(self, command, end=default_command_end):
+        # Neither the enable password nor a credential on a configuration line is written to the recording
+        self._event(sent, masked_secret + end if self.enable_password and command == self.enable_password
+                    else redact_secrets(command) + end)
+        self.engine._send_command(command, end)
+
+    def close_connection(self):
+        try:
+            self.engine.close_connection()
+        finally:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+
+class ReplayEngine(BaseEngine):
+
+    def __init__(self, path, speed=None, strict=True):
+        super().__init__()
+        self.path = path
+        self.speed = speed
+        self.strict = strict
+        self.header = {}
+        self.timeout = 10
+        # Whatever was typed at the enable prompt was masked in the recording, any stand in will do
+        self.enable_password = masked_secret
+        self._events = deque()
+        self._replay_start = 0
+        self._closed = False
+
+    @property
+    def is_connected(self):
+        return not self._closed
+
+    def set_keepalive(self, interval):
+        pass
+
+    def connect_to_server(self, ip=None, username=None, password=None, port=None, **kwargs):
+        with gzip.open(self.path, 'rt', encoding='utf-8') as file:
+            self.header = json.loads(next(file))
+            if self.header['version'] != recording_version:
+                raise ReplayError(f'{self.path} is a version {self.header["version"]} recording, '
+                                  f'expected {recording_version}')
+            self._events = deque(tuple(json.loads(line)) for line in file)
+        self.metrics_device = ip or self.header['ip']
+        self.prompt, self.hostname = self.header['prompt'], self.header['hostname']
+        # The output was read the way the session was recorded, replaying it another way would split it differently
+        self.event_driven_reads = self.header['event_driven_reads']
+        self.deterministic_completion = self.header['deterministic_completion']
+        self._closed = False
+        self._replay_start = monotonic()
+
+    def _due(self, recorded_time):
+        return self._replay_start + recorded_time / self.speed if self.speed else 0
+
+    def _next_received(self):
+        if self._events and self._events[0][1] == received:
+            return self._events[0]
+        return None
+
+    def _wait_for_output(self, timeout):
+        event = self._next_received()
+        if not event:
+            # Nothing else comes until the next command is sent, the same silence the device gave
+            sleep(timeout)
+            return False
+        wait = self._due(event[0]) - monotonic()
+        if wait > 0:
+            sleep(min(wait, timeout))
+        return wait <= timeout
+
+    def _get_output(self, buffer_size):
+        event = self._next_received()
+        if not event or monotonic() < self._due(event[0]):
+            return ''
+        self._events.popleft()
+        self._recv_calls += 1
+        self._bytes_received += len(event[2])
+        return event[2]
+
+    def _send_command(self, command, end=default_command_end):
+        if self._closed:
+            raise ReplayError('The replayed session is closed')
+        unread = 0
+        while self._next_received():
+            unread += len(self._events.popleft()[2])
+        if not self._events:
+            raise ReplayError(f'{command!r} was sent after the end of the recording')
+        recorded_time, _, recorded = self._events.popleft()
+        if self.strict:
+            if unread:
+                raise ReplayError(f'{unread} characters of recorded output were never read before {command!r} was sent')
+            if recorded != redact_secrets(command) + end and recorded != masked_secret + end:
+                raise ReplayError(f'{command + end!r} was sent where the recording has {recorded!r}')
+        # Output is timed from the command that prompted it, so time spent outside the engine does not add up
+        if self.speed:
+            self._replay_start = monotonic() - recorded_time / self.speed
+
+    def close_connection(self):
+        self._closed = True
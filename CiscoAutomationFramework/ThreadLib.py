@@ -1,21 +1,39 @@
 from threading import Thread
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from collections import deque
+from ipaddress import ip_network
 from CiscoAutomationFramework import connect_ssh
 from CiscoAutomationFramework.FirmwareBase import CiscoFirmware
+from CiscoAutomationFramework.TransportEngines import check_unique_commands
+from CiscoAutomationFramework.Exceptions import DeviceUnreachable
+from CiscoAutomationFramework.Reachability import probe
 from abc import ABC, abstractmethod
 
 class SSH(Thread, ABC):
 
-    def __init__(self, ip, username, password, enable_password=None, perform_secondary_action=False, **kwargs):
+    def __init__(self, ip, username, password, enable_password=None, perform_secondary_action=False,
+                 session_pool=None, port=22, metrics=None, jumphost=None, deterministic_completion=False,
+                 latency_profiles=None, channels=1, firmware_cache=None, **kwargs):
 
         super().__init__()
         self.ip = ip
         self.username = username
         self.password = password
+        self.port = port
         self.enable_password = enable_password
         self.perform_secondary_action = perform_secondary_action
         self.hostname = ''
         self.commands_sent = []
         self.is_nexus = False
+        self.exception = None
+        self.session_pool = session_pool
+        self.metrics = metrics
+        self.jumphost = jumphost
+        self.deterministic_completion = deterministic_completion
+        self.latency_profiles = latency_profiles
+        self.channels = channels
+        self.firmware_cache = firmware_cache
+        self.reachable = None
 
     def during_login(self, ssh):
         pass
@@ -26,16 +44,38 @@ class SSH(Thread, ABC):
     def post_secondary_action(self, ssh):
         pass
 
+    def _run_session(self, ssh):
+        commands_sent_before = len(ssh.commands_sent)
+        self.is_nexus = ssh.is_nexus
+        self.hostname = ssh.hostname
+        self.during_login(ssh)
+        if self.perform_secondary_action:
+            self.secondary_action(ssh)
+            self.post_secondary_action(ssh)
+        self.commands_sent = ssh.commands_sent[commands_sent_before:]
+
     def run(self) -> None:
+        if isinstance(self.exception, DeviceUnreachable):
+            return
+
+        if self.session_pool:
+            # Only the options this job was given override how the pool itself was told to connect
+            options = {name: value for name, value, default in (
+                ('metrics', self.metrics, None), ('jumphost', self.jumphost, None),
+                ('deterministic_completion', self.deterministic_completion, False),
+                ('latency_profiles', self.latency_profiles, None), ('channels', self.channels, 1),
+                ('firmware_cache', self.firmware_cache, None)) if value != default}
+            with self.session_pool.session(self.ip, self.username, self.password, port=self.port,
+                                           enable_password=self.enable_password, **options) as ssh:
+                self._run_session(ssh)
+            return
 
-        with connect_ssh(self.ip, self.username, self.password, enable_password=self.enable_password) as ssh:
-            self.is_nexus = ssh.is_nexus
-            self.hostname = ssh.hostname
-            self.during_login(ssh)
-            if self.perform_secondary_action:
-                self.secondary_action(ssh)
-                self.post_secondary_action(ssh)
-            self.commands_sent = ssh.commands_sent
+        with connect_ssh(self.ip, self.username, self.password, port=self.port,
+                         enable_password=self.enable_password, metrics=self.metrics, jumphost=self.jumphost,
+                         deterministic_completion=self.deterministic_completion,
+                         latency_profiles=self.latency_profiles, channels=self.channels,
+                         firmware_cache=self.firmware_cache) as ssh:
+            self._run_session(ssh)
 
 
 class SSHSplitDeviceType(SSH):
@@ -84,14 +124,30 @@ class SSHSplitDeviceType(SSH):
             self.ios_post_secondary_action(ssh)
 
 
+def prescan(jobs, timeout=1.0, max_concurrent=512):
+    # Behind a jumphost the devices are only reachable from the jumphost, probing them from here says nothing
+    jobs = [job for job in jobs if not job.jumphost]
+    for port in {job.port for job in jobs}:
+        results = probe([job.ip for job in jobs if job.port == port], port, timeout, max_concurrent)
+        for job in jobs:
+            if job.port != port:
+                continue
+            job.reachable = results[job.ip] is None
+            if not job.reachable:
+                job.exception = DeviceUnreachable(job.ip, port, results[job.ip])
+    return [job for job in jobs if job.reachable is False]
+
+
 def start_threads(object, ips, username, password, enable_password=None,
-                  perform_secondary_action=False, wait_for_threads=False, **kwargs):
+                  perform_secondary_action=False, wait_for_threads=False, prescan_timeout=None, **kwargs):
 
     if not issubclass(object, SSH):
         raise TypeError('object MUST be a subclass of ThreadedSSH!')
 
     threads = [object(ip=ip, username=username, password=password, enable_password=enable_password,
                       perform_secondary_action=perform_secondary_action, **kwargs) for ip in ips]
+    if prescan_timeout:
+        prescan(threads, prescan_timeout)
     for thread in threads:
         thread.start()
 
@@ -99,4 +155,137 @@ def start_threads(object, ips, username, password, enable_password=None,
         for thread in threads:
             thread.join()
 
-    return threads
\ No newline at end of file
+    return threads
+
+
+def subnet_key(prefix=24):
+    def key(ip):
+        return str(ip_network(f'{ip}/{prefix}', strict=False))
+    return key
+
+
+def start_pool(object, ips, username, password, enable_password=None, perform_secondary_action=False,
+               max_workers=50, group_key=None, group_limit=None, prescan_timeout=None, **kwargs):
+    if not issubclass(object, SSH):
+        raise TypeError('object MUST be a subclass of ThreadedSSH!')
+
+    jobs = [object(ip=ip, username=username, password=password, enable_password=enable_password,
+                   perform_secondary_action=perform_secondary_action, **kwargs) for ip in ips]
+    if prescan_timeout:
+        # Dead hosts are reported straight away instead of each holding a worker for the whole connect timeout
+        yield from prescan(jobs, prescan_timeout)
+
+    pending = {}
+    for job in jobs:
+        if job.reachable is False:
+            continue
+        group = group_key(job.ip) if group_key else None
+        pending.setdefault(group, deque()).append(job)
+
+    def limit_for(group):
+        if isinstance(group_limit, dict):
+            return group_limit.get(group)
+        return group_limit
+
+    running = {}
+    running_per_group = {group: 0 for group in pending}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            submitted = True
+            while submitted and len(running) < max_workers:
+                submitted = False
+                for group in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    limit = limit_for(group)
+                    if limit and running_per_group[group] >= limit:
+                        continue
+                    job = pending[group].popleft()
+                    if not pending[group]:
+                        del pending[group]
+                    running[executor.submit(job.run)] = (job, group)
+                    running_per_group[group] += 1
+                    submitted = True
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, group = running.pop(future)
+                running_per_group[group] -= 1
+                job.exception = future.exception()
+                yield job
+
+
+class ConfigPush(SSH):
+
+    def __init__(self, ip, username, password, config=(), on_error='continue', batch_size=None, **kwargs):
+        super().__init__(ip, username, password, **kwargs)
+        self.config = config
+        self.on_error = on_error
+        self.batch_size = batch_size
+        self.result = None
+
+    def during_login(self, ssh):
+        self.result = ssh.push_config(self.config, on_error=self.on_error, batch_size=self.batch_size)
+
+
+def push_config(ips, username, password, config, enable_password=None, on_error='continue', batch_size=None,
+                max_workers=25, group_key=None, group_limit=None, **kwargs):
+    return start_pool(ConfigPush, ips, username, password, enable_password=enable_password, max_workers=max_workers,
+                      group_key=group_key, group_limit=group_limit, config=config, on_error=on_error,
+                      batch_size=batch_size, **kwargs)
+
+
+class ConfigBackup(SSH):
+
+    def __init__(self, ip, username, password, store=None, startup=False, **kwargs):
+        super().__init__(ip, username, password, **kwargs)
+        self.store = store
+        self.startup = startup
+        self.changed = {}
+
+    def during_login(self, ssh):
+        self.changed = self.store.backup(ssh, device=self.ip, startup=self.startup)
+
+
+def backup_configs(ips, username, password, store, enable_password=None, startup=False, max_workers=50,
+                   group_key=None, group_limit=None, **kwargs):
+    return start_pool(ConfigBackup, ips, username, password, enable_password=enable_password, max_workers=max_workers,
+                      group_key=group_key, group_limit=group_limit, store=store, startup=startup, **kwargs)
+
+
+class CollectTables(SSH):
+
+    def __init__(self, ip, username, password, **kwargs):
+        super().__init__(ip, username, password, **kwargs)
+        self.mac_entries = []
+        self.arp_entries = []
+
+    def during_login(self, ssh):
+        self.mac_entries = ssh.mac_address_entries
+        self.arp_entries = ssh.arp_entries
+
+
+def collect_tables(ips, username, password, enable_password=None, max_workers=50, group_key=None, group_limit=None,
+                   **kwargs):
+    return start_pool(CollectTables, ips, username, password, enable_password=enable_password, max_workers=max_workers,
+                      group_key=group_key, group_limit=group_limit, **kwargs)
+
+
+class SendCommands(SSH):
+
+    def __init__(self, ip, username, password, commands=(), **kwargs):
+        super().__init__(ip, username, password, **kwargs)
+        self.commands = list(commands)
+        check_unique_commands(self.commands)
+        self.outputs = {}
+
+    def during_login(self, ssh):
+        if self.channels > 1:
+            outputs = ssh.send_commands_parallel(self.commands)
+        else:
+            ssh.cli_to_privileged_exec_mode()
+            ssh.terminal_length('0')
+            outputs = ssh.send_commands_get_output(self.commands)
+        # The echoed command and the trailing prompt are not part of the output
+        self.outputs = {command: output[1:-1] for command, output in outputs.items()}
+
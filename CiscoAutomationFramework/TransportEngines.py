@@ -1,24 +1,57 @@
 from CiscoAutomationFramework.Exceptions import AuthenticationException
+from CiscoAutomationFramework.Latency import command_key
 from paramiko import SSHClient, AutoAddPolicy
 from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
-from time import sleep
+from select import select
+from codecs import getincrementaldecoder
+from time import sleep, monotonic, perf_counter
+import re
 
 default_command_end = '\n'
 default_buffer = 100
+min_recv_size = 4096
 default_timeout = 1
 default_delay = .5
 standard_prompt_endings = ('>', '#', '> ', '# ')
+standard_password_prompts = ('Password:', 'password:')
+standard_confirm_prompts = (']?', '[confirm]')
+pager_prompt = '--More--'
+# What is left of a pager prompt once the device has erased it with backspaces
+pager_artifact_pattern = re.compile(r' *--More-- *|\x08+(?: +\x08+)?')
+masked_secret = '<secret>'
+# A configuration line that renames the device, whose prompt changes as soon as the line is accepted
+hostname_command_pattern = re.compile(r'\s*(?:hostname|switchname)\s+(\S+)\s*$')
+config_command_key = '<config>'
+
+
+def check_unique_commands(commands):
+    # Outputs are returned keyed by command, a command given twice would only have one of its outputs returned
+    if len(set(commands)) != len(commands):
+        raise ValueError('Each command can only be given once, outputs are returned keyed by command')
 
 
 class BaseEngine(ABC):
 
     def __init__(self):
         self.hostname = ''
+        self._new_hostnames = ()
         self.prompt = None
         self.enable_password = None
         self.commands_sent_since_last_output_get = 0
         self.all_commands_sent = []
+        self.event_driven_reads = False
+        self.deterministic_completion = False
+        self._prompt_patterns = None
+        self.metrics = None
+        self.metrics_device = ''
+        self._command_metrics = None
+        self._recv_calls = 0
+        self._bytes_received = 0
+        self._timeouts = 0
+        self.latency_profiles = None
+        self._latency_command = None
+        self.max_channels = 1
 
     def __enter__(self):
         return self
@@ -26,6 +59,56 @@ class BaseEngine(ABC):
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close_connection()
 
+    def _command_key(self, command):
+        # Commands are counted by what they are, never by what was typed into them, so neither a password nor
+        # every configuration line pushed ends up as a label of its own
+        if self.enable_password and command == self.enable_password:
+            return masked_secret
+        if self.prompt and self.in_configuration_mode:
+            return config_command_key
+        return command_key(command)
+
+    def _start_command_metrics(self, command):
+        # Output for several commands sent before a read is attributed to the first of them
+        if self.metrics is None or self._command_metrics is not None:
+            return
+        self._command_metrics = (self._command_key(command), perf_counter(), self._recv_calls, self._bytes_received,
+                                 self._timeouts)
+
+    def _finish_command_metrics(self):
+        if self._command_metrics is None:
+            return
+        command, start, recv_calls, bytes_received, timeouts = self._command_metrics
+        self._command_metrics = None
+        if self.metrics is not None:
+            self.metrics.record_command(self.metrics_device, command, perf_counter() - start,
+                                        self._bytes_received - bytes_received, self._recv_calls - recv_calls,
+                                        self._timeouts - timeouts)
+
+    def _start_latency_tracking(self, command):
+        if self.latency_profiles is None or self._latency_command is not None:
+            return
+        # Only what is learned about show and exec commands is worth keeping, a password or a configuration
+        # line never makes it into a profile that is written to disk
+        key = self._command_key(command)
+        if key not in (masked_secret, config_command_key):
+            self._latency_command = key
+
+    def _adapt_to_latency(self, buffer_size, timeout):
+        command = self._latency_command
+        self._latency_command = None
+        if command is None:
+            return None, buffer_size, timeout
+        idle_timeout = self.latency_profiles.idle_timeout(self.metrics_device, command, timeout)
+        if timeout != default_timeout:
+            # A timeout the caller chose is the least the command gets, only the default is the library's to shorten
+            idle_timeout = max(idle_timeout, timeout)
+        return command, self.latency_profiles.buffer_size(self.metrics_device, command, buffer_size), idle_timeout
+
+    def _record_phase(self, phase, seconds):
+        if self.metrics is not None:
+            self.metrics.record_phase(self.metrics_device, phase, seconds)
+
     def _extract_prompt(self, output):
         try:
             last_line_of_output = output[-1].strip()
@@ -34,10 +117,101 @@ class BaseEngine(ABC):
         for prompt_ending in standard_prompt_endings:
             if prompt_ending in last_line_of_output:
                 self.prompt = f'{last_line_of_output.split(prompt_ending)[0]}{prompt_ending}'
-                return
+                break
+        else:
+            return
+        if self._new_hostnames:
+            hostname = re.sub(r'(\([^)\s]*\))?[>#] ?$', '', self.prompt)
+            if hostname in self._new_hostnames:
+                self._new_hostnames = ()
+                self._rename_hostname(hostname)
+
+    def _track_hostname_change(self, command):
+        match = hostname_command_pattern.match(command)
+        if match and match.group(1) != self.hostname:
+            self._new_hostnames += (match.group(1),)
+
+    def _rename_hostname(self, hostname):
+        self.hostname = hostname
+
+    def _get_prompt_patterns(self):
+        hostnames = (self.hostname, *self._new_hostnames)
+        if not self._prompt_patterns or self._prompt_patterns[0] != hostnames:
+            # A pager prompt erased with backspaces can be left in front of the prompt on the same line, and
+            # after a hostname line the prompt may carry the old name or the new one until the new one shows up
+            names = '|'.join(re.escape(hostname) for hostname in hostnames)
+            prompt = rf'(?:[^\n]*\x08)?[\s\x08]*(?:{names})(\([^)\s]*\))?[>#]'
+            self._prompt_patterns = (hostnames, re.compile(prompt), re.compile(rf'{prompt}\s*$'))
+        return self._prompt_patterns[1:]
+
+    def _starts_with_prompt(self, line):
+        return self._get_prompt_patterns()[0].match(line) is not None
+
+    def _is_prompt(self, line):
+        return self._get_prompt_patterns()[1].match(line) is not None
+
+    def _wait_for_output(self, timeout):
+        sleep(min(timeout, .1))
+        return True
+
+    def _iter_until_prompt(self, buffer_size=default_buffer, timeout=default_timeout, prompts=1, echo=None):
+        command, buffer_size, timeout = self._adapt_to_latency(buffer_size, timeout)
+        tail = ''
+        prompts_seen = 0
+        # The last few characters of the echoed command mark where its output starts, a prompt
+        # seen before the echo is left over from an earlier command and does not count
+        echo = echo.strip()[-20:] if echo else ''
+        echo_seen = not echo
+        echo_window = ''
+        last_received = monotonic()
+        end = last_received + timeout
+        max_gap = 0
+        received = 0
+        timed_out = False
+        try:
+            while True:
+                from_device = self._get_output(buffer_size)
+                if from_device:
+                    now = monotonic()
+                    max_gap = max(max_gap, now - last_received)
+                    last_received = now
+                    received += len(from_device)
+                    yield from_device
+                    end = monotonic() + timeout
+                    if not echo_seen:
+                        echo_window = echo_window[-len(echo):] + from_device
+                        echo_seen = echo in echo_window
+                    # Only the newly received data plus the unterminated last line is inspected
+                    lines = (tail + from_device).split('\n')
+                    tail = lines.pop()
+                    prompts_seen += sum(1 for line in lines if self._starts_with_prompt(line))
+                    if not echo_seen:
+                        continue
+                    if self._is_prompt(tail) and prompts_seen + 1 >= prompts:
+                        break
+                    if echo and tail.strip().endswith(standard_password_prompts + standard_confirm_prompts):
+                        break
+                else:
+                    remaining = end - monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        timed_out = True
+                        max_gap = max(max_gap, monotonic() - last_received)
+                        break
+                    self._wait_for_output(remaining)
+        finally:
+            # Also runs when a caller stops reading early, the output seen so far is still a fair sample
+            if command is not None:
+                self.latency_profiles.record(self.metrics_device, command, max_gap, received, timed_out)
+
+    def _read_until_prompt(self, buffer_size=default_buffer, timeout=default_timeout, prompts=1, echo=None):
+        return ''.join(self._iter_until_prompt(buffer_size, timeout, prompts, echo))
 
     def send_command(self, command, end=default_command_end):
 
+        self._start_command_metrics(command)
+        self._start_latency_tracking(command)
+        self._track_hostname_change(command)
         self.commands_sent_since_last_output_get += 1
         self.all_commands_sent.append(command)
         return self._send_command(command, end)
@@ -46,48 +220,181 @@ class BaseEngine(ABC):
         if no_command_sent_previous:
             self.commands_sent_since_last_output_get += 1
 
-        output = ''
+        if self.event_driven_reads or self.deterministic_completion:
+            return self._get_output_until_prompt(buffer_size, timeout)
+
+        command, buffer_size, timeout = self._adapt_to_latency(buffer_size, timeout)
+        max_gap = 0
+        timed_out = False
+        chunks = []
         for x in range(self.commands_sent_since_last_output_get):
-            data = '\n'
+            # Only the last line is looked at while reading, everything is joined and split up once at the end
+            last_line = '\n'
             end = datetime.now() + timedelta(seconds=timeout)
+            last_received = datetime.now()
 
-            while not all([data.splitlines()[-1].startswith(self.hostname), any([x in data.splitlines()[-1] for x in standard_prompt_endings])]):
+            while not all([last_line.strip('\r\n').startswith((self.hostname, *self._new_hostnames)), any([x in last_line for x in standard_prompt_endings])]):
                 from_device = self._get_output(buffer_size)
                 if from_device:
-                    data += from_device
+                    chunks.append(from_device)
+                    last_line = (last_line + from_device).splitlines(keepends=True)[-1]
+                    max_gap = max(max_gap, (datetime.now() - last_received).total_seconds())
+                    last_received = datetime.now()
                     end = datetime.now() + timedelta(seconds=timeout)
                 else:
                     if datetime.now() > end:
+                        self._timeouts += 1
+                        timed_out = True
+                        max_gap = max(max_gap, (datetime.now() - last_received).total_seconds())
                         break
                     sleep(.1)
-            output += data[1:]
+        output = ''.join(chunks)
+
+        if command is not None:
+            self.latency_profiles.record(self.metrics_device, command, max_gap, len(output), timed_out)
 
         self.commands_sent_since_last_output_get = 0
 
-        if type(output) != list:
-            output = output.splitlines()
+        output = output.splitlines()
 
         self._extract_prompt(output)
+        self._finish_command_metrics()
 
         return output
 
+    def _get_output_until_prompt(self, buffer_size=default_buffer, timeout=default_timeout, echo=None):
+        output = ''
+        if self.commands_sent_since_last_output_get:
+            output = self._read_until_prompt(buffer_size, timeout, self.commands_sent_since_last_output_get, echo)
+        self.commands_sent_since_last_output_get = 0
+        output = output.splitlines()
+        self._extract_prompt(output)
+        self._finish_command_metrics()
+        return output
+
+    def iter_output(self, buffer_size=default_buffer, timeout=default_timeout, echo=None):
+        prompts = self.commands_sent_since_last_output_get
+        self.commands_sent_since_last_output_get = 0
+        if not prompts:
+            return
+        tail = ''
+        try:
+            for from_device in self._iter_until_prompt(buffer_size, timeout, prompts, echo):
+                lines = (tail + from_device).split('\n')
+                tail = lines.pop()
+                for line in lines:
+                    yield line.rstrip('\r')
+        finally:
+            # A caller that stops reading early still ends the command, the next one is not timed from here
+            self._finish_command_metrics()
+        if tail:
+            self._extract_prompt([tail])
+            yield tail
+
+    def send_command_iter_output(self, command, end=default_command_end, buffer_size=default_buffer, timeout=default_timeout):
+        self.send_command(command, end)
+        return self.iter_output(buffer_size, timeout, echo=command)
+
     def send_command_get_output(self, command, end=default_command_end, buffer_size=default_buffer, timeout=default_timeout, delay=default_delay):
         self.send_command(command, end)
+        if self.deterministic_completion:
+            return self._get_output_until_prompt(buffer_size, timeout, echo=command)
         if delay:
             sleep(delay)
+            self._record_phase('delay', delay)
         return self.get_output(buffer_size, timeout)
 
-    def send_command_get_truncated_output(self, command):
-        self.send_command(command)
-        output = []
-        while True:
-            for line in self.get_output(timeout=.1):
-                output.append(line)
+    def _split_on_prompts(self, lines):
+        outputs = [[]]
+        prompt_pattern = self._get_prompt_patterns()[0]
+        for line in lines:
+            match = prompt_pattern.match(line)
+            if not match:
+                outputs[-1].append(line)
+                continue
+            outputs[-1].append(line[:match.end()].strip())
+            outputs.append([line[match.end():]] if line[match.end():].strip() else [])
+        if not outputs[-1]:
+            outputs.pop()
+        return outputs
+
+    def send_commands_get_output(self, commands, end=default_command_end, buffer_size=default_buffer, timeout=default_timeout):
+        commands = list(commands)
+        check_unique_commands(commands)
+        outputs = self.send_commands_get_output_list(commands, end, buffer_size, timeout)
+        return dict(zip(commands, outputs))
+
+    def send_commands_get_output_list(self, commands, end=default_command_end, buffer_size=default_buffer, timeout=default_timeout):
+        commands = list(commands)
+        if not commands:
+            return []
+        self._start_command_metrics(commands[0])
+        self._start_latency_tracking(commands[0])
+        for command in commands:
+            self._track_hostname_change(command)
+        self.commands_sent_since_last_output_get += len(commands)
+        self.all_commands_sent.extend(commands)
+        self._send_command(end.join(commands), end)
+
+        output = self._read_until_prompt(buffer_size, timeout, len(commands), echo=commands[-1]).splitlines()
+        self.commands_sent_since_last_output_get = 0
+        # Split while a prompt under the name the device had before a hostname line still counts
+        outputs = self._split_on_prompts(output)
+        self._extract_prompt(output)
+        self._finish_command_metrics()
+        return [outputs[index] if index < len(outputs) else [] for index in range(len(commands))]
 
-            if self.prompt in '\n'.join(output):
+    def send_command_get_head(self, command, lines=10, buffer_size=default_buffer, timeout=default_timeout):
+        self.send_command(command)
+        self.commands_sent_since_last_output_get = 0
+        head = []
+        tail = ''
+        for from_device in self._iter_until_prompt(buffer_size, timeout, echo=command):
+            head_lines = (tail + from_device).split('\n')
+            tail = head_lines.pop()
+            head += [pager_artifact_pattern.sub('', line).rstrip('\r') for line in head_lines]
+            if len(head) >= lines:
                 break
-            else:
-                self.send_command(' ', end='')
+            if pager_prompt in tail:
+                # A short terminal length pages before enough lines have come, so the pager is sent on
+                tail = ''
+                self._send_command(' ', end='')
+        else:
+            if tail:
+                head.append(tail)
+            self._extract_prompt(head)
+            self._finish_command_metrics()
+            return head[:lines]
+
+        # Enough has been read, quit the pager (or let the rest of the output go by) and get back to the prompt
+        last_data = tail
+        if pager_prompt in tail:
+            last_data = ''
+            self._send_command('q', end='')
+        for from_device in self._iter_until_prompt(buffer_size, timeout):
+            last_data = (last_data + from_device)[-200:]
+            if pager_prompt in last_data:
+                last_data = ''
+                self._send_command('q', end='')
+        self._extract_prompt(last_data.replace('\x08', '').splitlines())
+        self._finish_command_metrics()
+        return head[:lines]
+
+    def send_command_get_truncated_output(self, command, buffer_size=default_buffer, timeout=default_timeout):
+        self.send_command(command)
+        self.commands_sent_since_last_output_get = 0
+        chunks = []
+        pager_window = ''
+        for from_device in self._iter_until_prompt(buffer_size, timeout, echo=command):
+            chunks.append(from_device)
+            # The pager waits on a key, so it is answered the moment it shows up instead of after a silence
+            pager_window = pager_window[-len(pager_prompt):] + from_device
+            if pager_prompt in pager_window:
+                pager_window = ''
+                self._send_command(' ', end='')
+        output = pager_artifact_pattern.sub('', ''.join(chunks)).splitlines()
+        self._extract_prompt(output)
+        self._finish_command_metrics()
         return output
 
     def _send_space_get_data(self, timeout=1):
@@ -172,22 +479,56 @@ class SSHEngine(BaseEngine):
         self.shell = None
         self.timeout = 10
         self._pre_jumphost_hostname = ''
+        self._decoder = getincrementaldecoder('utf-8')(errors='replace')
+        self._owns_client = True
 
     @property
     def _in_jumphost(self):
         return self._pre_jumphost_hostname != self.hostname
+
+    def _rename_hostname(self, hostname):
+        # The device was renamed, which is not the same as having jumped to another one
+        if not self._in_jumphost:
+            self._pre_jumphost_hostname = hostname
+        super()._rename_hostname(hostname)
     
-    def connect_to_server(self, ip, username, password, port):
+    def connect_to_server(self, ip, username, password, port, sock=None):
+        self.metrics_device = ip
+        start = perf_counter()
         self.client.connect(
             hostname=ip,
             port=port,
             username=username,
             password=password,
-            timeout=self.timeout
+            timeout=self.timeout,
+            sock=sock
         )
         self.shell = self.client.invoke_shell()
+        self._decoder.reset()
+        shell_opened = perf_counter()
+        if self.latency_profiles is not None:
+            self.latency_profiles.record_connect(ip, shell_opened - start)
         self.prompt, self.hostname = self._get_prompt_and_hostname()
         self._pre_jumphost_hostname = self.hostname
+        self._record_phase('handshake', shell_opened - start)
+        self._record_phase('prompt_detection', perf_counter() - shell_opened)
+
+    def open_shell_channel(self) -> 'SSHEngine':
+        if self._in_jumphost:
+            raise RuntimeError(f'Shell channels open on the device the transport is connected to, not on {self.hostname}')
+        # Another interactive shell on the transport that is already authenticated, so no new login
+        channel = type(self)()
+        channel.client = self.client
+        channel._owns_client = False
+        for attribute in ('enable_password', 'timeout', 'event_driven_reads', 'deterministic_completion', 'metrics',
+                          'metrics_device', 'latency_profiles'):
+            setattr(channel, attribute, getattr(self, attribute))
+        start = perf_counter()
+        channel.shell = self.client.invoke_shell()
+        channel.prompt, channel.hostname = channel._get_prompt_and_hostname()
+        channel._pre_jumphost_hostname = channel.hostname
+        channel._record_phase('channel_open', perf_counter() - start)
+        return channel
 
     def jumphost(self, ip, password, username=None, port=None, ssh_ver=None, vrf=None):
         command_string = 'ssh '
@@ -206,15 +547,34 @@ class SSHEngine(BaseEngine):
         _ = self._get_output(100)
         self.send_command(password)
         self.prompt, self.hostname = self._get_prompt_and_hostname()
+        self._finish_command_metrics()
 
     def exit_jumphost(self):
         if self._in_jumphost:
             self.send_command('exit')
             self.prompt, self.hostname = self._get_prompt_and_hostname()
+            self._finish_command_metrics()
+
+    @property
+    def is_connected(self):
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active() and self.shell and not self.shell.closed)
+
+    def set_keepalive(self, interval):
+        self.client.get_transport().set_keepalive(interval)
+
+    def _wait_for_output(self, timeout):
+        readable, _, _ = select([self.shell], [], [], timeout)
+        return bool(readable)
 
     def _get_output(self, buffer_size):
         if self.shell.recv_ready():
-            return bytes.decode(self.shell.recv(buffer_size))
+            # Reads are never smaller than min_recv_size, and a multibyte character split between two reads
+            # is held back by the decoder until the rest of it arrives
+            data = self.shell.recv(max(buffer_size, min_recv_size))
+            self._recv_calls += 1
+            self._bytes_received += len(data)
+            return self._decoder.decode(data)
         return ''
     
     def _send_command(self, command, end='\n'):
@@ -222,5 +582,45 @@ class SSHEngine(BaseEngine):
 
     def close_connection(self):
         self.exit_jumphost()
+        if self._owns_client:
+            self.client.close()
+        else:
+            self.shell.close()
+        
+
+
+class SSHJumphost:
+
+    def __init__(self, ip, username, password, port=22, timeout=10, keepalive_interval=30):
+        self.ip = ip
+        self.timeout = timeout
+        self.client = SSHClient()
+        self.client.set_missing_host_key_policy(AutoAddPolicy())
+        self.client.connect(hostname=ip, port=port, username=username, password=password, timeout=timeout)
+        if keepalive_interval:
+            self.client.get_transport().set_keepalive(keepalive_interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close_connection()
+
+    @property
+    def is_connected(self):
+        transport = self.client.get_transport()
+        return bool(transport and transport.is_active())
+
+    def open_channel(self, ip, port=22):
+        # Every downstream session is a direct-tcpip channel multiplexed over the one bastion transport
+        return self.client.get_transport().open_channel('direct-tcpip', (ip, port), ('127.0.0.1', 0),
+                                                        timeout=self.timeout)
+
+    def connect(self, ip, username, password, port=22, timeout=None):
+        engine = SSHEngine()
+        engine.timeout = timeout or self.timeout
+        engine.connect_to_server(ip, username, password, port, sock=self.open_channel(ip, port))
+        return engine
+
+    def close_connection(self):
         self.client.close()
-        
\ No newline at end of file
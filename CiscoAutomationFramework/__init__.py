@@ -1,11 +1,68 @@
-from CiscoAutomationFramework.TransportEngines import SSHEngine
-from CiscoAutomationFramework.FirmwareDetect import detect_firmware
-from CiscoAutomationFramework.FirmwareBase import CiscoFirmware
+from importlib import import_module
+
+# paramiko and the firmware classes are only imported once something actually needs them
+lazy_imports = {
+    'SSHEngine': 'CiscoAutomationFramework.TransportEngines',
+    'detect_firmware': 'CiscoAutomationFramework.FirmwareDetect',
+    'CiscoFirmware': 'CiscoAutomationFramework.FirmwareBase',
+}
+default_connect_timeout = 10
+
+
+def __getattr__(name):
+    if name in lazy_imports:
+        return getattr(import_module(lazy_imports[name]), name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def connect_ssh(ip, username, password, port=22, enable_password=None, timeout=None,
+                event_driven_reads=False, deterministic_completion=False, firmware_cache=None, metrics=None,
+                jumphost=None, latency_profiles=None, record_to=None, channels=1) -> 'CiscoFirmware':
+    from CiscoAutomationFramework.TransportEngines import SSHEngine
+    from CiscoAutomationFramework.FirmwareDetect import detect_firmware
 
-def connect_ssh(ip, username, password, port=22, enable_password=None, timeout=10) -> CiscoFirmware:
     engine = SSHEngine()
+    if record_to:
+        from CiscoAutomationFramework.SessionRecording import RecordingEngine
+        engine = RecordingEngine(engine, record_to)
     engine.enable_password = enable_password
-    engine.timeout = timeout
-    engine.connect_to_server(ip, username, password, port)
-    firmware = detect_firmware(engine)
+    engine.timeout = timeout or default_connect_timeout
+    if latency_profiles:
+        # Only the default is the library's to shorten, a timeout the caller chose is the least the connect gets
+        learned = latency_profiles.connect_timeout(ip, engine.timeout)
+        engine.timeout = max(learned, timeout) if timeout else learned
+    engine.event_driven_reads = event_driven_reads
+    engine.deterministic_completion = deterministic_completion
+    engine.metrics = metrics
+    engine.latency_profiles = latency_profiles
+    # A recording holds the one shell, commands are not spread over extra channels while recording
+    engine.max_channels = 1 if record_to else channels
+    engine.connect_to_server(ip, username, password, port, sock=jumphost.open_channel(ip, port) if jumphost else None)
+    firmware = firmware_cache.get(ip, engine) if firmware_cache else None
+    if not firmware:
+        firmware = detect_firmware(engine)
+        if firmware_cache:
+            firmware_cache.set(ip, firmware)
     return firmware
+
+
+def connect_replay(path, speed=None, strict=True, metrics=None) -> 'CiscoFirmware':
+    from CiscoAutomationFramework.SessionRecording import ReplayEngine
+    from CiscoAutomationFramework.FirmwareDetect import detect_firmware
+
+    engine = ReplayEngine(path, speed, strict)
+    engine.metrics = metrics
+    engine.connect_to_server()
+    return detect_firmware(engine)
+
+
+async def connect_ssh_async(ip, username, password, port=22, enable_password=None, timeout=10):
+    # asyncssh is only needed by the asyncio engine, so it is imported on first use
+    from CiscoAutomationFramework.AsyncTransportEngines import AsyncSSHEngine
+    from CiscoAutomationFramework.AsyncFirmware import detect_firmware as detect_firmware_async
+
+    engine = AsyncSSHEngine()
+    engine.enable_password = enable_password
+    engine.timeout = timeout
+    await engine.connect_to_server(ip, username, password, port)
+    return await detect_firmware_async(engine)
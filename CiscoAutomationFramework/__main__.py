@@ -0,0 +1,122 @@
+from getpass import getpass
+from time import monotonic
+import argparse
+import json
+import csv
+import sys
+import os
+
+
+def read_inventory(path):
+    with open(path, newline='') as file:
+        if path.lower().endswith('.csv'):
+            rows = csv.DictReader(file)
+            column = next((name for name in rows.fieldnames or () if name.strip().lower() in ('ip', 'host')), None)
+            if not column:
+                raise SystemExit(f'{path} needs an "ip" or "host" column')
+            return [row[column].strip() for row in rows if row[column] and row[column].strip()]
+        return [line.split('#')[0].strip() for line in file if line.split('#')[0].strip()]
+
+
+def read_commands(args):
+    commands = list(args.command or [])
+    if args.commands_file:
+        with open(args.commands_file) as file:
+            commands += [line.rstrip() for line in file if line.strip() and not line.startswith('#')]
+    if not commands:
+        raise SystemExit('No commands given, use --command or --commands-file')
+    # Outputs are reported per command, so a repeated one is a mistake that would otherwise fail every device
+    repeated = sorted({command for command in commands if commands.count(command) > 1})
+    if repeated:
+        raise SystemExit(f'Commands given more than once: {", ".join(repeated)}')
+    return commands
+
+
+def job_record(job, finished_after):
+    return {'ip': job.ip, 'hostname': job.hostname, 'success': job.exception is None,
+            'error': repr(job.exception) if job.exception else None, 'finished_after': round(finished_after, 3),
+            'outputs': {command: '\n'.join(output) for command, output in job.outputs.items()}}
+
+
+class JsonLinesWriter:
+
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, record):
+        self.file.write(json.dumps(record) + '\n')
+        self.file.flush()
+
+
+class CsvWriter:
+
+    def __init__(self, file):
+        self.file = file
+        self.writer = csv.writer(file)
+        self.writer.writerow(['ip', 'hostname', 'success', 'error', 'command', 'output'])
+
+    def write(self, record):
+        row = [record['ip'], record['hostname'], record['success'], record['error'] or '']
+        for command, output in record['outputs'].items() or [('', '')]:
+            self.writer.writerow(row + [command, output])
+        self.file.flush()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m CiscoAutomationFramework',
+                                     description='Run commands across an inventory of Cisco devices and stream the '
+                                                 'results as each device finishes.')
+    parser.add_argument('inventory', help='file with one device per line, or a CSV file with an ip or host column')
+    parser.add_argument('-c', '--command', action='append', help='command to run, can be given multiple times')
+    parser.add_argument('--commands-file', help='file with one command per line')
+    parser.add_argument('-u', '--username', default=os.environ.get('CISCO_USERNAME'),
+                        help='defaults to $CISCO_USERNAME or a prompt')
+    parser.add_argument('--enable', action='store_true',
+                        help='ask for an enable password when $CISCO_ENABLE_PASSWORD is not set')
+    parser.add_argument('-p', '--port', type=int, default=22)
+    parser.add_argument('-w', '--max-workers', type=int, default=50, help='devices worked on at the same time')
+    parser.add_argument('--channels', type=int, default=1,
+                        help='shell channels opened per device to run show commands side by side')
+    parser.add_argument('-f', '--format', choices=('jsonl', 'csv'), default='jsonl')
+    parser.add_argument('-o', '--output', help='file to write results to, defaults to stdout')
+    parser.add_argument('--prescan-timeout', type=float,
+                        help='probe the SSH port of every device first and fail the ones that do not answer within '
+                             'this many seconds without spending a worker on them')
+    parser.add_argument('--legacy-reads', action='store_true',
+                        help='read output with the fixed delays instead of waiting on the prompt')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ips = read_inventory(args.inventory)
+    commands = read_commands(args)
+    username = args.username or input('Username: ')
+    password = os.environ.get('CISCO_PASSWORD') or getpass(f'Password for {username}: ')
+    enable_password = os.environ.get('CISCO_ENABLE_PASSWORD')
+    if args.enable and not enable_password:
+        enable_password = getpass('Enable password: ')
+
+    # Only pulled in once the arguments are known to be good, so --help and mistakes return straight away
+    from CiscoAutomationFramework.ThreadLib import SendCommands, start_pool
+
+    output = open(args.output, 'w', newline='') if args.output else sys.stdout
+    writer = CsvWriter(output) if args.format == 'csv' else JsonLinesWriter(output)
+    failures = 0
+    start = monotonic()
+    try:
+        for job in start_pool(SendCommands, ips, username, password, enable_password=enable_password,
+                              max_workers=args.max_workers, port=args.port, commands=commands,
+                              prescan_timeout=args.prescan_timeout, channels=args.channels,
+                              deterministic_completion=not args.legacy_reads):
+            writer.write(job_record(job, monotonic() - start))
+            failures += job.exception is not None
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f'{len(ips) - failures}/{len(ips)} devices succeeded in {monotonic() - start:.1f}s', file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+from CiscoAutomationFramework.AsyncTransportEngines import AsyncBaseEngine
+from CiscoAutomationFramework.AsyncFirmware import AsyncIOS, AsyncIOSXE, AsyncNXOS
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework import connect_ssh, connect_ssh_async
+import asyncio
+import pytest
+
+
+class SilentEngine(AsyncBaseEngine):
+
+    def __init__(self):
+        super().__init__()
+        self.commands = []
+
+    async def connect_to_server(self, ip, username, password, port):
+        pass
+
+    async def _send_command(self, command, end):
+        self.commands.append(command)
+
+    async def _get_output(self, buffer_size, timeout):
+        await asyncio.sleep(timeout)
+        return ''
+
+    async def close_connection(self):
+        pass
+
+
+class FlakyEngine(SilentEngine):
+
+    def __init__(self):
+        super().__init__()
+        self.failures = 0
+        self.hostname, self.prompt = 'sw1', 'sw1#'
+        self.pending = ''
+
+    async def _send_command(self, command, end):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('connection reset')
+        await super()._send_command(command, end)
+        self.pending += f'{command}\r\nsw1#'
+
+    async def _get_output(self, buffer_size, timeout):
+        output, self.pending = self.pending, ''
+        return output
+
+
+def test_terminal_settings_are_only_cached_once_sent():
+    async def set_terminal(ssh):
+        for setting in (ssh.terminal_length, ssh.terminal_width):
+            engine.failures = 1
+            with pytest.raises(OSError):
+                await setting('0')
+            await setting('0')
+            await setting('0')
+
+    engine = FlakyEngine()
+    asyncio.run(set_terminal(AsyncIOS(engine)))
+    assert engine.commands == ['terminal length 0', 'terminal width 0']
+
+
+def test_prompt_detection_gives_up_after_the_timeout():
+    engine = SilentEngine()
+    engine.timeout = .3
+    with pytest.raises(TimeoutError):
+        asyncio.run(asyncio.wait_for(engine._get_prompt_and_hostname(timeout=.1), 5))
+    assert engine.commands
+
+
+@pytest.mark.parametrize('firmware, firmware_class', [('IOS', AsyncIOS), ('IOSXE', AsyncIOSXE), ('NXOS', AsyncNXOS)])
+def test_async_firmware_matches_blocking_firmware(firmware, firmware_class):
+    async def collect(port):
+        ssh = await connect_ssh_async('127.0.0.1', 'admin', 'admin', port=port, enable_password='enable')
+        async with ssh:
+            return (type(ssh), await ssh.uptime, await ssh.interfaces, await ssh.mac_address_entries,
+                    await ssh.arp_entries, await ssh.running_config, await ssh.save_config())
+
+    with MockCiscoServer(firmware=firmware, start_in_privileged_mode=False, enable_password='enable') as server:
+        detected, *async_results = asyncio.run(collect(server.port))
+        with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, enable_password='enable',
+                         deterministic_completion=True) as ssh:
+            results = [ssh.uptime, ssh.interfaces, ssh.mac_address_entries, ssh.arp_entries, ssh.running_config,
+                       ssh.save_config()]
+
+    assert detected is firmware_class
+    assert async_results == results
+    assert results[0] and results[1] and results[2] and results[-1] is True
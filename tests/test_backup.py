@@ -0,0 +1,60 @@
+from CiscoAutomationFramework.Backup import ConfigBackupStore, normalize_config
+import os
+
+config = """Building configuration...
+
+Current configuration : 1234 bytes
+! Last configuration change at 10:00:00 UTC Mon Jan 1 2024
+hostname sw1
+interface Gi1/0/1
+ description uplink
+end
+"""
+
+
+def object_count(path):
+    return sum(len(files) for _, _, files in os.walk(os.path.join(path, 'objects')))
+
+
+def test_normalize_config_drops_volatile_lines():
+    assert normalize_config(config) == 'hostname sw1\ninterface Gi1/0/1\n description uplink\nend\n'
+
+
+def test_store_round_trip(tmp_path):
+    store = ConfigBackupStore(str(tmp_path))
+    digest, changed = store.store('10.0.0.1', config, hostname='sw1', timestamp=1)
+    assert changed
+    assert store.load(digest) == normalize_config(config)
+    assert store.latest('10.0.0.1').digest == digest
+    assert store.devices() == ['10.0.0.1']
+
+
+def test_unchanged_config_is_not_stored_again(tmp_path):
+    store = ConfigBackupStore(str(tmp_path))
+    digest, _ = store.store('10.0.0.1', config, timestamp=1)
+    # Only the volatile lines differ, the digest is the same
+    again = config.replace('10:00:00', '11:30:00')
+    assert store.store('10.0.0.1', again, timestamp=2) == (digest, False)
+    assert len(store.snapshots('10.0.0.1')) == 1
+
+
+def test_identical_configs_share_one_object(tmp_path):
+    store = ConfigBackupStore(str(tmp_path))
+    first, _ = store.store('10.0.0.1', config)
+    second, _ = store.store('10.0.0.2', config)
+    assert first == second
+    assert object_count(str(tmp_path)) == 1
+
+
+def test_history_survives_reopening_and_diffs(tmp_path):
+    store = ConfigBackupStore(str(tmp_path))
+    store.store('sw1/a', config, timestamp=1)
+    store.store('sw1/a', config.replace('uplink', 'downlink'), timestamp=2)
+
+    reopened = ConfigBackupStore(str(tmp_path))
+    assert [snapshot.timestamp for snapshot in reopened.snapshots('sw1/a')] == [1, 2]
+    assert reopened.devices() == ['sw1/a']
+    diff = reopened.diff('sw1/a')
+    assert '- description uplink' in diff
+    assert '+ description downlink' in diff
+    assert reopened.store('sw1/a', config.replace('uplink', 'downlink'))[1] is False
@@ -0,0 +1,64 @@
+from CiscoAutomationFramework import CommandCache as command_cache_module
+from CiscoAutomationFramework.CommandCache import CommandCache
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_only_show_commands_are_cacheable():
+    assert CommandCache.is_cacheable('show version')
+    assert CommandCache.is_cacheable('  SH ip int br')
+    assert not CommandCache.is_cacheable('shutdown')
+    assert not CommandCache.is_cacheable('configure terminal')
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(command_cache_module, 'monotonic', clock)
+    cache = CommandCache(default_ttl=10, ttls={'show mac': 2})
+    cache.set('a', 'show version', ['v'])
+    cache.set('b', 'show mac address-table', ['m'])
+
+    clock.now += 5
+    assert cache.get('a') == ['v']
+    assert cache.get('b') is None
+    clock.now += 6
+    assert cache.get('a') is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_zero_ttl_is_never_cached():
+    cache = CommandCache(ttls={'show clock': 0})
+    cache.set('a', 'show clock', ['12:00'])
+    assert cache.get('a') is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CommandCache(max_entries=2)
+    cache.set('a', 'show a', ['a'])
+    cache.set('b', 'show b', ['b'])
+    assert cache.get('a') == ['a']
+    cache.set('c', 'show c', ['c'])
+    assert cache.get('b') is None
+    assert cache.get('a') == ['a']
+    assert cache.get('c') == ['c']
+
+
+def test_returned_output_is_a_copy():
+    cache = CommandCache()
+    cache.set('a', 'show a', ['a'])
+    cache.get('a').append('changed')
+    assert cache.get('a') == ['a']
+
+
+def test_invalidate_clears_everything():
+    cache = CommandCache()
+    cache.set('a', 'show a', ['a'])
+    cache.invalidate()
+    assert cache.get('a') is None
@@ -0,0 +1,32 @@
+from CiscoAutomationFramework.ConfigPush import ConfigLineError, config_lines, find_config_errors
+
+
+def test_config_lines_drop_blank_lines_and_comments():
+    config = 'interface Gi1/0/1\n description uplink  \n!\n\n  ! a comment\n exit\n'
+    assert config_lines(config) == ['interface Gi1/0/1', ' description uplink', ' exit']
+    assert config_lines(['hostname sw1', '']) == ['hostname sw1']
+
+
+def test_find_config_errors_numbers_lines_from_the_batch_start():
+    lines = ['interface Gi1/0/1', ' bogus command', ' description ok']
+    outputs = [
+        ['sw1(config)#interface Gi1/0/1'],
+        ['sw1(config-if)# bogus command', '                 ^', "% Invalid input detected at '^' marker.", ''],
+        ['sw1(config-if)# description ok'],
+    ]
+    assert find_config_errors(lines, outputs, 11) == [
+        ConfigLineError(12, ' bogus command', ["% Invalid input detected at '^' marker."])
+    ]
+
+
+def test_find_config_errors_ignores_percent_signs_inside_lines():
+    lines = ['banner motd ^100% uptime^']
+    outputs = [['sw1(config)#banner motd ^100% uptime^']]
+    assert find_config_errors(lines, outputs) == []
+
+
+def test_find_config_errors_collects_every_message_of_a_line():
+    lines = ['router ospf 1']
+    outputs = [['% Incomplete command.', '% OSPF: process already exists']]
+    assert find_config_errors(lines, outputs)[0].messages == ['% Incomplete command.',
+                                                             '% OSPF: process already exists']
@@ -0,0 +1,54 @@
+from CiscoAutomationFramework.FirmwareDetect import FirmwareCache
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.SessionPool import SessionPool
+from CiscoAutomationFramework.ThreadLib import start_threads, CollectTables
+from time import time
+import json
+import os
+import pytest
+
+
+class Firmware:
+
+    def __init__(self, hostname):
+        self.hostname = hostname
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = FirmwareCache(str(tmp_path / 'firmware.json'), lock_timeout=.2)
+    cache.set('10.0.0.1', Firmware('sw1'))
+    return cache
+
+
+def test_a_live_lock_of_another_process_is_left_alone(cache):
+    with open(f'{cache.path}.lock', 'w') as file:
+        file.write('other')
+    assert cache.flush() is False
+    with open(f'{cache.path}.lock') as file:
+        assert file.read() == 'other'
+    assert not os.path.exists(cache.path)
+
+    # Still dirty, so once the other process is done the next flush writes it out
+    os.remove(f'{cache.path}.lock')
+    assert cache.flush() is True
+    with open(cache.path) as file:
+        assert list(json.load(file)) == ['10.0.0.1']
+
+
+def test_a_stale_lock_is_broken(cache):
+    with open(f'{cache.path}.lock', 'w') as file:
+        file.write('died')
+    os.utime(f'{cache.path}.lock', (time() - 3600, time() - 3600))
+    assert cache.flush() is True
+    assert not os.path.exists(f'{cache.path}.lock')
+
+
+@pytest.mark.parametrize('pooled', [False, True])
+def test_threads_detect_through_the_cache(tmp_path, pooled):
+    cache = FirmwareCache(str(tmp_path / 'firmware.json'))
+    with MockCiscoServer(firmware='NXOS') as server, SessionPool() as pool:
+        thread, = start_threads(CollectTables, ['127.0.0.1'], 'admin', 'admin', port=server.port,
+                                firmware_cache=cache, session_pool=pool if pooled else None, wait_for_threads=True)
+    assert thread.exception is None
+    assert cache._entries['127.0.0.1']['firmware'] == 'NXOS'
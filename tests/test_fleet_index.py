@@ -0,0 +1,79 @@
+from CiscoAutomationFramework.FleetIndex import FleetIndex, MacLocation
+
+access_macs = [('10', '0011.2233.4455', 'DYNAMIC', 'Gi1/0/1'), ('10', '0011.2233.4466', 'DYNAMIC', 'Gi1/0/2'),
+               ('10', '00aa.bbcc.ddee', 'DYNAMIC', 'Gi1/0/48')]
+core_macs = [('10', '0011.2233.4455', 'dynamic', 'Po1'), ('10', '0011.2233.4466', 'dynamic', 'Po1')]
+core_arp = [('10.0.0.5', '00:01:00', '0011.2233.4455', 'Vlan10'), ('10.0.0.6', '-', '0011.2233.4466', 'Vlan10')]
+
+
+def build_index():
+    index = FleetIndex()
+    index.update('10.1.1.1', access_macs, [], hostname='access1')
+    index.update('10.1.1.2', core_macs, core_arp, hostname='core1')
+    return index
+
+
+def test_lookups():
+    index = build_index()
+    assert len(index) == 3
+    assert sorted(index.locate_mac('0011-2233-4455')) == [MacLocation('10.1.1.1', 'Gi1/0/1', 10),
+                                                          MacLocation('10.1.1.2', 'Po1', 10)]
+    assert index.edge_location('0011.2233.4455') == MacLocation('10.1.1.1', 'Gi1/0/1', 10)
+    assert index.mac_for_ip('10.0.0.6') == '0011.2233.4466'
+    assert index.locate_ip('10.0.0.99') == []
+
+
+def test_unchanged_tables_are_not_reindexed():
+    index = build_index()
+    assert index.update('10.1.1.1', list(reversed(access_macs)), [], hostname='access1') is False
+    assert index.update('10.1.1.1', access_macs[:1], [], hostname='access1') is True
+    assert index.locate_mac('0011.2233.4466') == [MacLocation('10.1.1.2', 'Po1', 10)]
+
+
+def test_remove_drops_only_that_device():
+    index = build_index()
+    index.remove('10.1.1.2')
+    assert index.devices == ['10.1.1.1']
+    assert index.locate_mac('0011.2233.4455') == [MacLocation('10.1.1.1', 'Gi1/0/1', 10)]
+    assert index.mac_for_ip('10.0.0.5') is None
+
+
+def test_save_load_round_trip(tmp_path):
+    index = build_index()
+    path = str(tmp_path / 'fleet.idx')
+    index.save(path)
+    loaded = FleetIndex.load(path)
+
+    assert loaded.devices == index.devices
+    assert loaded.hostnames == index.hostnames
+    assert loaded.macs == index.macs
+    assert loaded.ips == index.ips
+    assert loaded.edge_location('0011.2233.4455') == index.edge_location('0011.2233.4455')
+    # A loaded index keeps working incrementally
+    assert loaded.update('10.1.1.2', core_macs, core_arp, hostname='core1') is False
+    loaded.remove('10.1.1.1')
+    assert loaded.locate_mac('00aa.bbcc.ddee') == []
+
+
+def test_address_shared_by_two_devices_survives_removing_one():
+    index = FleetIndex()
+    index.update('10.1.1.2', [], [('10.0.0.1', '-', '0000.0c07.ac0a', 'Vlan10')])
+    index.update('10.1.1.3', [], [('10.0.0.1', '-', '0000.0c07.ac0b', 'Vlan10')])
+    index.remove('10.1.1.3')
+    assert index.mac_for_ip('10.0.0.1') == '0000.0c07.ac0a'
+    index.remove('10.1.1.2')
+    assert index.mac_for_ip('10.0.0.1') is None
+
+
+def test_shared_address_is_kept_across_save_and_load(tmp_path):
+    index = FleetIndex()
+    index.update('10.1.1.2', [], [('10.0.0.1', '-', '0000.0c07.ac0a', 'Vlan10')])
+    index.update('10.1.1.3', [], [('10.0.0.1', '-', '0000.0c07.ac0a', 'Vlan10')])
+    path = str(tmp_path / 'fleet.idx')
+    index.save(path)
+    loaded = FleetIndex.load(path)
+    loaded.remove('10.1.1.2')
+    assert loaded.mac_for_ip('10.0.0.1') == '0000.0c07.ac0a'
+    # Changing what a device reported only drops its own share of the address
+    loaded.update('10.1.1.3', [], [])
+    assert loaded.mac_for_ip('10.0.0.1') is None
@@ -0,0 +1,45 @@
+from CiscoAutomationFramework import connect_ssh
+from CiscoAutomationFramework.Latency import LatencyProfiles
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+import pytest
+
+
+@pytest.fixture
+def server():
+    with MockCiscoServer(firmware='IOS') as server:
+        yield server
+
+
+def test_timed_out_read_doubles_the_wait_even_after_some_output():
+    profiles = LatencyProfiles(min_samples=1)
+    profiles.record('sw1', 'show mac address-table', .01, 5000)
+    waited = profiles.idle_timeout('sw1', 'show mac address-table', 1)
+    # The echo and the first lines came back, then the device stalled for the whole wait
+    profiles.record('sw1', 'show mac address-table', waited, 300, timed_out=True)
+    assert profiles.idle_timeout('sw1', 'show mac address-table', 1) >= 2 * waited
+    assert profiles.devices['sw1']['show mac'].srtt == .01
+
+
+def test_reads_catch_up_with_a_device_that_slows_down(server):
+    profiles = LatencyProfiles()
+    with connect_ssh('127.0.0.1', 'a', 'a', port=server.port, latency_profiles=profiles,
+                     deterministic_completion=True) as ssh:
+        ssh.send_command_get_output('terminal length 0')
+        for _ in range(3):
+            expected = ssh.send_command_get_output('show mac address-table')
+
+        server.settings.command_latency['show mac'] = .7
+        for _ in range(4):
+            if ssh.send_command_get_output('show mac address-table')[-1:] == expected[-1:]:
+                break
+        assert ssh.send_command_get_output('show mac address-table') == expected
+        assert profiles.idle_timeout('127.0.0.1', 'show mac address-table', 1) > .7
+
+
+def test_connect_timeout_chosen_by_the_caller_is_kept(server):
+    profiles = LatencyProfiles(min_samples=1)
+    profiles.record_connect('127.0.0.1', .01)
+    with connect_ssh('127.0.0.1', 'a', 'a', port=server.port, latency_profiles=profiles) as ssh:
+        assert ssh.transport.timeout == profiles.min_connect_timeout
+    with connect_ssh('127.0.0.1', 'a', 'a', port=server.port, timeout=15, latency_profiles=profiles) as ssh:
+        assert ssh.transport.timeout == 15
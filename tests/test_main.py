@@ -0,0 +1,11 @@
+from CiscoAutomationFramework.__main__ import main
+import pytest
+
+
+def test_repeated_commands_stop_the_run_before_connecting(tmp_path, monkeypatch):
+    inventory = tmp_path / 'inventory.txt'
+    inventory.write_text('192.0.2.1\n')
+    monkeypatch.setenv('CISCO_USERNAME', 'admin')
+    monkeypatch.setenv('CISCO_PASSWORD', 'admin')
+    with pytest.raises(SystemExit, match='more than once: show clock'):
+        main([str(inventory), '-c', 'show clock', '-c', 'show version', '-c', 'show clock', '--channels', '2'])
@@ -0,0 +1,92 @@
+from CiscoAutomationFramework.Parsers import parse_mac_address_table, parse_arp_table, parse_interfaces, \
+    MacAddressEntry, ArpEntry, InterfaceEntry
+from CiscoAutomationFramework.Exceptions import ParserError
+import os
+import pytest
+
+recorded = os.path.join(os.path.dirname(__file__), os.pardir, 'Benchmarks', 'recorded')
+
+
+def recorded_lines(name):
+    with open(os.path.join(recorded, name)) as file:
+        return file.read().splitlines()
+
+
+def test_ios_mac_address_table():
+    assert parse_mac_address_table(recorded_lines('ios_mac_address_table.txt'), 'IOS') == [
+        MacAddressEntry('All', '0100.0ccc.cccc', 'STATIC', 'CPU'),
+        MacAddressEntry('All', '0100.0ccc.cccd', 'STATIC', 'CPU'),
+        MacAddressEntry('1', '0011.2233.4455', 'DYNAMIC', 'Gi1/0/1'),
+        MacAddressEntry('10', '00a1.b2c3.d4e5', 'DYNAMIC', 'Gi1/0/24'),
+        MacAddressEntry('200', '5c5a.c7e1.0f31', 'DYNAMIC', 'Po1'),
+    ]
+
+
+def test_ios_mac_address_table_with_legend():
+    lines = [
+        'Legend: * - primary entry',
+        '        age - seconds since last seen',
+        '        n/a - not available',
+        '',
+        '  vlan   mac address     type    learn     age              ports',
+        '------+----------------+--------+-----+----------+--------------------------',
+        'Displaying entries from active supervisor:',
+        '',
+        '*  10  0011.2233.4455   dynamic  Yes          0   Gi1/1',
+        '*  20  0011.2233.4466    static  No          -   Router',
+        '',
+        '          Multicast Entries',
+        'Total Mac Addresses for this criterion: 2',
+        'Total Mac Address Space Available: 7936',
+    ]
+    assert parse_mac_address_table(lines, 'IOS') == [
+        MacAddressEntry('10', '0011.2233.4455', 'dynamic', 'Gi1/1'),
+        MacAddressEntry('20', '0011.2233.4466', 'static', 'Router'),
+    ]
+
+
+def test_nxos_mac_address_table():
+    entries = parse_mac_address_table(recorded_lines('nxos_mac_address_table.txt'), 'NXOS')
+    assert entries[0] == MacAddressEntry('10', '0011.2233.4455', 'dynamic', 'Eth1/1')
+    assert MacAddressEntry('200', '5c5a.c7e1.0f32', 'dynamic', 'vPC Peer-Link') in entries
+    assert MacAddressEntry('-', '0011.2233.4466', 'static', 'sup-eth1(R)') in entries
+
+
+def test_ios_arp_table_skips_incomplete_entries():
+    assert parse_arp_table(recorded_lines('ios_arp_table.txt'), 'IOS') == [
+        ArpEntry('10.0.0.1', '-', '0011.2233.4455', 'Vlan10'),
+        ArpEntry('10.0.0.2', '12', '00a1.b2c3.d4e5', 'Vlan10'),
+        ArpEntry('10.20.0.17', '0', '5c5a.c7e1.0f31', 'GigabitEthernet0/0'),
+    ]
+
+
+def test_nxos_arp_table_skips_incomplete_entries():
+    assert parse_arp_table(recorded_lines('nxos_arp_table.txt'), 'NXOS') == [
+        ArpEntry('10.1.1.1', '00:01:23', '0011.2233.4455', 'Vlan10'),
+        ArpEntry('10.1.1.5', '00:12:03', '5c5a.c7e1.0f31', 'Ethernet1/5'),
+    ]
+
+
+def test_unrecognised_line_raises():
+    with pytest.raises(ParserError, match='line 2'):
+        parse_mac_address_table(['Vlan    Mac Address       Type        Ports', 'something unexpected'], 'IOS')
+
+
+def test_unknown_firmware_raises():
+    with pytest.raises(ParserError, match='ASA'):
+        parse_arp_table([], 'ASA')
+
+
+def test_interfaces():
+    lines = [
+        'GigabitEthernet1/0/1 is up, line protocol is up (connected)',
+        '  Hardware is Gigabit Ethernet, address is 0011.2233.4455 (bia 0011.2233.4455)',
+        'GigabitEthernet1/0/2 is administratively down, line protocol is down (disabled)',
+        'Ethernet1/1 is up',
+        'admin state is up, Dedicated Interface',
+    ]
+    assert parse_interfaces(lines) == [
+        InterfaceEntry('GigabitEthernet1/0/1', 'up', 'up'),
+        InterfaceEntry('GigabitEthernet1/0/2', 'administratively down', 'down'),
+        InterfaceEntry('Ethernet1/1', 'up', 'up'),
+    ]
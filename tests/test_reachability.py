@@ -0,0 +1,27 @@
+from CiscoAutomationFramework.Reachability import probe
+import socket
+import pytest
+
+
+@pytest.fixture
+def listener():
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(16)
+    yield server.getsockname()[1]
+    server.close()
+
+
+def test_probe_reports_each_host_once(listener):
+    results = probe(['127.0.0.1', 'localhost', '127.0.0.1', 'no-such-host.invalid'], listener, timeout=1)
+    assert sorted(results) == ['127.0.0.1', 'localhost', 'no-such-host.invalid']
+    assert results['127.0.0.1'] is None
+    assert results['localhost'] is None
+    assert results['no-such-host.invalid']
+
+
+def test_probe_reports_refused_connections():
+    with socket.socket() as unused:
+        unused.bind(('127.0.0.1', 0))
+        port = unused.getsockname()[1]
+    assert probe(['127.0.0.1'], port, timeout=1)['127.0.0.1']
@@ -0,0 +1,51 @@
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.SessionPool import SessionPool
+from time import sleep
+import pytest
+
+
+@pytest.fixture
+def server():
+    with MockCiscoServer(firmware='IOS') as server:
+        yield server
+
+
+def test_sessions_are_only_reused_for_the_same_login(server):
+    with SessionPool() as pool:
+        first = pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port)
+        pool.release(first)
+        assert pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port) is first
+        pool.release(first)
+
+        others = [pool.acquire('127.0.0.1', 'admin', 'other', port=server.port),
+                  pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port, enable_password='x'),
+                  pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True)]
+        assert all(session is not first for session in others)
+        assert len({id(session) for session in others}) == len(others)
+        for session in others:
+            pool.release(session)
+        assert server.connections == 4
+
+
+def test_idle_sessions_are_evicted_when_another_is_released(server):
+    with SessionPool(idle_timeout=.2) as pool:
+        first = pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port)
+        second = pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port)
+        pool.release(first)
+        sleep(.3)
+        pool.release(second)
+        assert not first.transport.is_connected
+        assert second.transport.is_connected
+        assert pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port) is second
+        pool.release(second)
+
+
+def test_a_discarded_session_is_closed(server):
+    with SessionPool() as pool:
+        with pytest.raises(RuntimeError):
+            with pool.session('127.0.0.1', 'admin', 'admin', port=server.port) as session:
+                raise RuntimeError
+        assert not session.transport.is_connected
+        replacement = pool.acquire('127.0.0.1', 'admin', 'admin', port=server.port)
+        assert replacement is not session
+        pool.release(replacement)
@@ -0,0 +1,61 @@
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.Exceptions import ReplayError
+from CiscoAutomationFramework import connect_ssh, connect_replay
+import gzip
+import pytest
+
+
+@pytest.fixture
+def recording(tmp_path):
+    path = str(tmp_path / 'session.jsonl.gz')
+    with MockCiscoServer(firmware='IOS', start_in_privileged_mode=False, enable_password='s3cret') as server:
+        with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, enable_password='s3cret',
+                         deterministic_completion=True, record_to=path) as ssh:
+            uptime = ssh.uptime
+    return path, uptime
+
+
+def test_replay_gives_the_recorded_output(recording):
+    path, uptime = recording
+    ssh = connect_replay(path)
+    assert type(ssh).__name__ == 'IOS'
+    assert ssh.uptime == uptime
+
+
+def test_enable_password_is_not_recorded(recording):
+    path, _ = recording
+    with gzip.open(path, 'rt') as file:
+        assert 's3cret' not in file.read()
+
+
+def test_strict_replay_rejects_a_different_command(recording):
+    path, _ = recording
+    ssh = connect_replay(path)
+    with pytest.raises(ReplayError, match="'show clock.*' was sent where the recording has 'enable"):
+        ssh.send_command_get_output('show clock')
+
+
+def test_commands_after_the_end_of_the_recording_are_rejected(recording):
+    path, _ = recording
+    ssh = connect_replay(path, strict=False)
+    ssh.uptime
+    with pytest.raises(ReplayError, match='after the end'):
+        ssh.send_command_get_output('show clock')
+
+
+def test_credentials_on_configuration_lines_are_not_recorded(tmp_path):
+    path = str(tmp_path / 'session.jsonl.gz')
+    with MockCiscoServer(firmware='IOS') as server:
+        with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True,
+                         record_to=path) as ssh:
+            ssh.add_local_user('bob', 'hunter2pass', privilege=15)
+            ssh.transport.send_command_get_output('snmp-server community n0tpublic RO')
+    with gzip.open(path, 'rt') as file:
+        recorded = file.read()
+    assert 'hunter2pass' not in recorded
+    assert 'n0tpublic' not in recorded
+
+    # Strict replay compares what is sent after masking it the same way
+    ssh = connect_replay(path)
+    ssh.add_local_user('bob', 'hunter2pass', privilege=15)
+    ssh.transport.send_command_get_output('snmp-server community n0tpublic RO')
@@ -0,0 +1,37 @@
+from CiscoAutomationFramework.ThreadLib import SSH, start_pool, subnet_key
+from collections import Counter
+from threading import Lock
+from time import sleep
+
+
+class CountingJob(SSH):
+
+    lock = Lock()
+    running = Counter()
+    most_running = Counter()
+    most_running_overall = 0
+
+    def run(self):
+        cls = type(self)
+        group = subnet_key(24)(self.ip)
+        with cls.lock:
+            cls.running[group] += 1
+            cls.most_running[group] = max(cls.most_running[group], cls.running[group])
+            cls.most_running_overall = max(cls.most_running_overall, sum(cls.running.values()))
+        sleep(.05)
+        with cls.lock:
+            cls.running[group] -= 1
+
+    def during_login(self, ssh):
+        pass
+
+
+def test_start_pool_limits_each_group():
+    ips = [f'10.0.{subnet}.{host}' for subnet in range(3) for host in range(1, 7)]
+    jobs = list(start_pool(CountingJob, ips, 'admin', 'admin', max_workers=5, group_key=subnet_key(24),
+                           group_limit={'10.0.0.0/24': 1, '10.0.1.0/24': 2}))
+    assert sorted(job.ip for job in jobs) == sorted(ips)
+    assert all(job.exception is None for job in jobs)
+    assert CountingJob.most_running['10.0.0.0/24'] == 1
+    assert CountingJob.most_running['10.0.1.0/24'] == 2
+    assert CountingJob.most_running_overall == 5
@@ -0,0 +1,156 @@
+from CiscoAutomationFramework import connect_ssh
+from CiscoAutomationFramework.MockDevice import MockCiscoServer
+from CiscoAutomationFramework.TransportEngines import SSHEngine, SSHJumphost
+from time import monotonic
+import pytest
+
+
+class ChunkedShell:
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+
+    def recv_ready(self):
+        return bool(self.chunks)
+
+    def recv(self, size):
+        return self.chunks.pop(0)
+
+
+@pytest.fixture
+def server():
+    with MockCiscoServer(firmware='IOS') as server:
+        yield server
+
+
+@pytest.mark.parametrize('on_error', ['continue', 'stop'])
+def test_prompt_follows_a_hostname_change(server, on_error):
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True) as ssh:
+        start = monotonic()
+        result = ssh.push_config(['hostname renamed', 'interface Gi1/0/1', ' description uplink'], on_error)
+        assert not result.errors
+        assert [output[-1] for output in result.outputs] == ['renamed(config)#', 'renamed(config-if)#',
+                                                             'renamed(config-if)#']
+        assert ssh.save_config()
+        assert ssh.transport.hostname == 'renamed'
+        assert ssh.transport.prompt == 'renamed#'
+        # Every read ended at the new prompt instead of waiting out its timeout
+        assert monotonic() - start < 2
+
+
+def test_repeated_commands_are_rejected_before_anything_is_sent(server):
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True,
+                     channels=2) as ssh:
+        sent = len(ssh.transport.all_commands_sent)
+        for send in (ssh.send_commands_get_output, ssh.send_commands_parallel, ssh.transport.send_commands_get_output):
+            with pytest.raises(ValueError, match='only be given once'):
+                send(['show clock', 'show version', 'show clock'])
+        assert len(ssh.transport.all_commands_sent) == sent
+
+
+@pytest.mark.parametrize('firmware', ['IOS', 'NXOS'])
+def test_event_driven_reads_match_the_fixed_delay_reads(firmware):
+    commands = ['terminal length 0', 'show version', 'show mac address-table', 'show running-config']
+    outputs = {}
+    with MockCiscoServer(firmware=firmware) as server:
+        for event_driven_reads in (False, True):
+            with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port,
+                             event_driven_reads=event_driven_reads) as ssh:
+                outputs[event_driven_reads] = [ssh.transport.send_command_get_output(command) for command in commands]
+    assert outputs[True] == outputs[False]
+    assert len(outputs[True][-1]) > 100
+
+
+def test_pipelined_outputs_are_split_on_the_prompts(server):
+    # show version starts a line with the hostname and the running config names it, neither is a prompt
+    commands = ['show version', 'bogus', 'show running-config', 'show clock']
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True) as ssh:
+        ssh.transport.send_command_get_output('terminal length 0')
+        expected = {command: ssh.transport.send_command_get_output(command) for command in commands}
+        outputs = ssh.transport.send_commands_get_output(commands)
+    assert any(line.startswith('ios-mock uptime is') for line in outputs['show version'])
+    assert 'hostname ios-mock' in outputs['show running-config']
+    assert outputs == expected
+
+
+def test_pager_is_answered_the_moment_it_shows_up(server):
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True) as ssh:
+        start = monotonic()
+        paged = ssh.transport.send_command_get_truncated_output('show running-config')
+        assert monotonic() - start < 1
+        ssh.transport.send_command_get_output('terminal length 0')
+        assert paged == ssh.transport.send_command_get_output('show running-config')
+
+
+@pytest.mark.parametrize('terminal_length', ['0', '5', '24'])
+def test_head_quits_the_pager_and_returns_to_the_prompt(server, terminal_length):
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True) as ssh:
+        ssh.transport.send_command_get_output(f'terminal length {terminal_length}')
+        start = monotonic()
+        head = ssh.transport.send_command_get_head('show running-config', lines=10)
+        assert monotonic() - start < 1
+        assert ssh.transport.prompt == 'ios-mock#'
+        ssh.transport.send_command_get_output('terminal length 0')
+        assert head == ssh.transport.send_command_get_output('show running-config')[:10]
+
+
+def test_characters_split_between_reads_are_decoded_whole():
+    text = 'description Büro – Raum 3 ✓\r\nsw1#'
+    data = text.encode()
+    # Every multibyte character is cut after its first byte by a read boundary
+    chunks, start = [], 0
+    for index, character in enumerate(text):
+        if len(character.encode()) > 1:
+            middle = len(text[:index].encode()) + 1
+            chunks.append(data[start:middle])
+            start = middle
+    chunks.append(data[start:])
+    engine = SSHEngine()
+    engine.shell = ChunkedShell(chunks)
+    received = []
+    while engine.shell.recv_ready():
+        received.append(engine._get_output(100))
+    assert ''.join(received) == text
+
+
+def test_terminal_and_mode_commands_are_only_sent_when_needed():
+    with MockCiscoServer(firmware='IOS', start_in_privileged_mode=False, enable_password='s3cret') as server:
+        with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, enable_password='s3cret',
+                         deterministic_completion=True) as ssh:
+            ssh.uptime
+            ssh.running_config
+            ssh.mac_address_entries
+            ssh.terminal_length('0')
+            sent = ssh.transport.all_commands_sent
+            assert sent.count('enable') == 1
+            assert sent.count('terminal length 0') == 1
+            assert ssh.session_state['terminal_length'] == 0
+
+
+def test_sessions_are_tunnelled_through_one_jumphost_transport():
+    with MockCiscoServer(firmware='IOS', hostname='bastion') as bastion, MockCiscoServer(firmware='NXOS') as device:
+        with SSHJumphost('127.0.0.1', 'admin', 'admin', port=bastion.port) as jumphost:
+            for _ in range(3):
+                with connect_ssh('127.0.0.1', 'admin', 'admin', port=device.port, jumphost=jumphost,
+                                 deterministic_completion=True) as ssh:
+                    assert type(ssh).__name__ == 'NXOS'
+                    assert ssh.hostname == 'nxos-mock'
+                    assert not ssh.transport._in_jumphost
+            assert jumphost.is_connected
+        assert (bastion.connections, device.connections) == (1, 3)
+
+
+def test_shell_channels_share_one_login(server):
+    commands = ['show version', 'show running-config', 'show mac address-table', 'show ip arp', 'show clock']
+    with connect_ssh('127.0.0.1', 'admin', 'admin', port=server.port, deterministic_completion=True,
+                     channels=3) as ssh:
+        channel = ssh.transport.open_shell_channel()
+        assert channel.prompt == ssh.transport.prompt
+        channel.send_command_get_output('terminal length 0')
+        expected = {command: channel.send_command_get_output(command) for command in commands}
+        channel.close_connection()
+        assert ssh.transport.is_connected
+
+        assert ssh.send_commands_parallel(commands) == expected
+        assert len(ssh._channels) == 2
+    assert server.connections == 1